@@ -0,0 +1,206 @@
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.data.cache import clear_cache
+from app.data.db import DB_PATH, POOL_SIZE, get_pool, transaction
+from app.data import datasets, incidents, tickets
+
+#Worker threads shared by all async callers. Each worker holds at most one
+#pooled connection at a time, so this also bounds the connections in use.
+EXECUTOR_WORKERS = POOL_SIZE
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def get_executor():
+    """Return the shared data access executor, creating it on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=EXECUTOR_WORKERS, thread_name_prefix="data")
+        return _executor
+
+def shutdown_executor():
+    """Wait for running queries and stop the executor (used on shutdown)."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+async def run_blocking(func, *args, **kwargs):
+    """
+    Run a blocking function on the data executor without blocking the event loop.
+
+    Args:
+        func: Function to run
+        args, kwargs: Arguments of the function
+
+    Returns:
+        Result of the function
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), functools.partial(func, *args, **kwargs))
+
+def _read(func, db_path, args, kwargs):
+    """Call a read function with a read-only pooled connection (runs on a worker thread)."""
+    with get_pool(db_path, read_only=True).connection() as conn:
+        return func(conn, *args, **kwargs)
+
+def async_read(func):
+    """
+    Make an async counterpart of a read function that takes a connection first.
+
+    The counterpart takes the same arguments without the connection, plus an
+    optional db_path, and borrows a read-only connection on a worker thread.
+
+    Args:
+        func: Read function, e.g. incidents.get_incident_facets
+
+    Returns:
+        Coroutine function
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, db_path=DB_PATH, **kwargs):
+        return await run_blocking(_read, func, db_path, args, kwargs)
+
+    return wrapper
+
+def async_write(func):
+    """
+    Make an async counterpart of a write function that manages its own connection.
+
+    Args:
+        func: Write function taking conn=None, e.g. incidents.insert_incident
+
+    Returns:
+        Coroutine function
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run_blocking(func, *args, **kwargs)
+
+    return wrapper
+
+async def gather_reads(queries, db_path=DB_PATH):
+    """
+    Run independent read functions concurrently, each on its own connection.
+
+    Unlike run_snapshot the queries do not share one snapshot, so use this
+    when the results need not be consistent with each other (e.g. the
+    charts of different domains).
+
+    Args:
+        queries: Dict of name -> function taking a connection
+        db_path: Path to the database file
+
+    Returns:
+        dict: name -> result of each query function
+    """
+    results = await asyncio.gather(*(run_blocking(_read, query, db_path, (), {})
+                                     for query in queries.values()))
+    return dict(zip(queries, results))
+
+def _run_transaction(work, db_path):
+    """Run a unit of work inside one transaction (runs on a worker thread)."""
+    with transaction(db_path) as conn:
+        return work(conn)
+
+async def run_transaction(work, db_path=DB_PATH):
+    """
+    Run several writes as one unit of work on a worker thread.
+
+    Args:
+        work: Function taking the transaction's connection, e.g.
+              lambda conn: insert_incident(..., conn=conn)
+        db_path: Path to the database file
+
+    Returns:
+        Result of work (everything is rolled back if it raises)
+    """
+    return await run_blocking(_run_transaction, work, db_path)
+
+#Async counterparts of the incident functions
+get_incidents_page = async_read(incidents.get_incidents_page)
+get_incident_id_range = async_read(incidents.get_incident_id_range)
+get_incident_series = async_read(incidents.get_incident_series)
+get_incident_facets = async_read(incidents.get_incident_facets)
+get_incident_counts = async_read(incidents.get_incident_counts)
+get_open_incidents = async_read(incidents.get_open_incidents)
+get_high_or_critical_incidents = async_read(incidents.get_high_or_critical_incidents)
+search_incidents = async_read(incidents.search_incidents)
+insert_incident = async_write(incidents.insert_incident)
+delete_incident = async_write(incidents.delete_incident)
+insert_incidents = async_write(incidents.insert_incidents)
+update_incidents_status = async_write(incidents.update_incidents_status)
+delete_incidents = async_write(incidents.delete_incidents)
+
+async def update_incident(incident_id, new_status):
+    """Async counterpart of incidents.update_incident."""
+    return await run_blocking(incidents.update_incident, None, incident_id, new_status)
+
+#Async counterparts of the ticket functions
+get_tickets_page = async_read(tickets.get_tickets_page)
+get_ticket_id_range = async_read(tickets.get_ticket_id_range)
+get_ticket_series = async_read(tickets.get_ticket_series)
+get_ticket_facets = async_read(tickets.get_ticket_facets)
+get_ticket_counts = async_read(tickets.get_ticket_counts)
+get_open_tickets = async_read(tickets.get_open_tickets)
+get_high_or_critical_tickets = async_read(tickets.get_high_or_critical_tickets)
+search_tickets = async_read(tickets.search_tickets)
+insert_ticket = async_write(tickets.insert_ticket)
+delete_ticket = async_write(tickets.delete_ticket)
+insert_tickets = async_write(tickets.insert_tickets)
+update_tickets_status = async_write(tickets.update_tickets_status)
+delete_tickets = async_write(tickets.delete_tickets)
+
+async def update_ticket(ticket_id, new_status):
+    """Async counterpart of tickets.update_ticket."""
+    return await run_blocking(tickets.update_ticket, None, ticket_id, new_status)
+
+#Async counterparts of the dataset functions
+get_datasets_page = async_read(datasets.get_datasets_page)
+get_dataset_id_range = async_read(datasets.get_dataset_id_range)
+get_dataset_count = async_read(datasets.get_dataset_count)
+get_dataset_series = async_read(datasets.get_dataset_series)
+get_dataset_facets = async_read(datasets.get_dataset_facets)
+insert_dataset = async_write(datasets.insert_dataset)
+delete_dataset = async_write(datasets.delete_dataset)
+insert_datasets = async_write(datasets.insert_datasets)
+delete_datasets = async_write(datasets.delete_datasets)
+
+async def update_dataset_record(dataset_id, new_record_count):
+    """Async counterpart of datasets.update_dataset_record."""
+    return await run_blocking(datasets.update_dataset_record, None, dataset_id, new_record_count)
+
+def testing_functions():
+    """Helper to compare serial and concurrent chart reads when executed directly."""
+    queries = {
+        "incidents": incidents.get_incident_facets,
+        "tickets": tickets.get_ticket_facets,
+        "datasets": datasets.get_dataset_facets,
+    }
+
+    start = time.perf_counter()
+    for query in queries.values():
+        _read(query, DB_PATH, (), {})
+    print(f"\n Serial reads: {time.perf_counter() - start:.3f}s")
+
+    #Time the queries themselves, not the cached results of the serial run
+    clear_cache()
+
+    start = time.perf_counter()
+    results = asyncio.run(gather_reads(queries))
+    print(f" Concurrent reads: {time.perf_counter() - start:.3f}s")
+
+    for name, charts in results.items():
+        print(f"   {name}: {', '.join(charts)}")
+
+    shutdown_executor()
+
+#Ensures that 'testing_functions' runs only when file is executed directly
+if __name__ == "__main__":
+    testing_functions()
@@ -0,0 +1,112 @@
+import time
+
+from app.data.db import DB_PATH, get_archive_path, get_connection
+from app.data.schema import ARCHIVED_TABLES, attach_archive, create_archive_tables, is_archive_attached, stored_columns
+
+#Closed and resolved records older than this many days move to the archive
+ARCHIVE_AFTER_DAYS = 365
+
+#Statuses of records that are finished and can be archived
+ARCHIVED_STATUSES = ("closed", "resolved")
+
+def source_table(conn, table, include_archive=False, columns=None):
+    """
+    Return the table, view or subquery a read function should select from.
+
+    Read functions with an include_archive flag (get_all_*, paging, the
+    aggregates, counters, series, facets and percentiles) use it. Full-text
+    search covers the main tables only, and open records are never archived.
+
+    Args:
+        conn: Database connection
+        table: Domain table
+        include_archive: Also read the archived rows
+        columns: Columns the query reads. The all_<table> view selects every
+                 column, which stops SQLite from using covering indexes, so
+                 aggregates pass their columns and get a UNION ALL of just those.
+
+    Returns:
+        str: table for hot rows only, all_<table> or a UNION ALL subquery for hot and archived rows
+    """
+    if not include_archive or table not in dict(ARCHIVED_TABLES):
+        return table
+
+    #Connections opened outside the pool attach the archive on first use
+    if not is_archive_attached(conn):
+        archive_path = get_archive_path(conn.execute("PRAGMA database_list").fetchone()[2] or ":memory:")
+        if archive_path is None:
+            return table
+        attach_archive(conn, archive_path)
+
+    #No archive table yet means nothing was archived
+    view = conn.execute("SELECT 1 FROM temp.sqlite_master WHERE type = 'view' AND name = ?",
+                        (f"all_{table}",)).fetchone()
+    if not view:
+        return table
+    if not columns:
+        return f"all_{table}"
+
+    #Each side of the union can be answered from its own covering index
+    column_list = ", ".join(dict.fromkeys(columns))
+    return f"(SELECT {column_list} FROM main.{table} UNION ALL SELECT {column_list} FROM archive.{table})"
+
+def archive_closed_records(older_than_days=ARCHIVE_AFTER_DAYS, db_path=DB_PATH):
+    """
+    Move closed and resolved incidents and tickets older than a given age to the archive database.
+
+    Rows are copied and deleted in one transaction, so the hot tables'
+    triggers keep the counters, search index and cache versions current.
+    In WAL mode a crash between the two files committing can leave a row
+    in both; it is copied again (same id) and removed by the next run.
+
+    Args:
+        older_than_days: Minimum age in days of the records moved
+        db_path: Path to the database file
+
+    Returns:
+        dict: table -> number of rows moved
+    """
+    cutoff = int(time.time()) - int(older_than_days) * 86400
+    placeholders = ", ".join("?" * len(ARCHIVED_STATUSES))
+    moved = {}
+
+    with get_connection(db_path) as conn:
+        #Attaching is not allowed inside a transaction
+        if not is_archive_attached(conn):
+            attach_archive(conn, get_archive_path(db_path))
+        create_archive_tables(conn)
+
+        #Take the write lock on both databases up front
+        if not conn.in_transaction:
+            conn.execute("BEGIN IMMEDIATE")
+
+        for table, ts_column in ARCHIVED_TABLES:
+            columns = ", ".join(stored_columns(conn, table))
+            condition = f"status_key IN ({placeholders}) AND {ts_column} < ?"
+            params = (*ARCHIVED_STATUSES, cutoff)
+
+            #Copy then delete the same rows (the write lock keeps the set unchanged in between)
+            conn.execute(f"""
+                INSERT OR REPLACE INTO archive.{table} ({columns})
+                SELECT {columns} FROM main.{table} WHERE {condition}
+                """, params)
+            moved[table] = conn.execute(f"DELETE FROM main.{table} WHERE {condition}", params).rowcount
+
+    return moved
+
+def get_archive_counts(db_path=DB_PATH):
+    """Return the number of archived rows of each archived table."""
+    with get_connection(db_path) as conn:
+        return {table: conn.execute(f"SELECT COUNT(*) FROM archive.{table}").fetchone()[0]
+                for table, _ in ARCHIVED_TABLES}
+
+def testing_functions():
+    """Helper to run the archival job when executed directly."""
+    start = time.perf_counter()
+    moved = archive_closed_records()
+    print(f"\n Archived in {time.perf_counter() - start:.2f}s: {moved}")
+    print(f" Rows in archive: {get_archive_counts()}")
+
+#Ensures that 'testing_functions' runs only when file is executed directly
+if __name__ == "__main__":
+    testing_functions()
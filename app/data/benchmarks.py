@@ -0,0 +1,102 @@
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from app.data.db import DB_PATH, STORAGE_PROFILES, connect_database
+
+#Read queries taken from the Analytics page
+READ_QUERIES = [
+    "SELECT incident_type, COUNT(*) AS count FROM cyber_incidents GROUP BY incident_type",
+    "SELECT status, COUNT(*) AS count FROM cyber_incidents GROUP BY status",
+    "SELECT severity, COUNT(*) AS count FROM cyber_incidents GROUP BY severity",
+    "SELECT priority, COUNT(*) AS count FROM it_tickets GROUP BY priority",
+    "SELECT assigned_to, COUNT(*) AS count FROM it_tickets GROUP BY assigned_to",
+]
+
+def copy_database(db_path, copy_path):
+    """
+    Copy a database with SQLite's backup API.
+
+    Unlike copying the file, this includes the changes still in the -wal
+    file and gives a consistent snapshot while the app is writing.
+
+    Args:
+        db_path: Database file to copy
+        copy_path: Destination file
+    """
+    source = sqlite3.connect(str(db_path))
+    target = sqlite3.connect(str(copy_path))
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+
+def _benchmark_profile(db_path, profile, writes, reads):
+    """Time single-row write transactions and analytical reads for one profile."""
+    conn = connect_database(db_path, profile=profile)
+    cursor = conn.cursor()
+
+    #Each write is its own transaction, like a Dashboard form submission
+    start = time.perf_counter()
+    for i in range(writes):
+        cursor.execute("""
+            INSERT INTO cyber_incidents
+            (date, incident_type, severity, status, description, reported_by)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """, ("2024-11-05", "Benchmark", "Low", "Open", f"Benchmark write {i}", "benchmark"))
+        conn.commit()
+    write_seconds = time.perf_counter() - start
+
+    #Run every read query repeatedly
+    start = time.perf_counter()
+    for _ in range(reads):
+        for query in READ_QUERIES:
+            cursor.execute(query).fetchall()
+    read_seconds = time.perf_counter() - start
+
+    conn.close()
+
+    return {
+        "profile": profile,
+        "writes_per_sec": writes / write_seconds if write_seconds else float("inf"),
+        "reads_per_sec": reads * len(READ_QUERIES) / read_seconds if read_seconds else float("inf"),
+    }
+
+def benchmark_storage_profiles(db_path=DB_PATH, writes=500, reads=200):
+    """
+    Measure read/write throughput of each storage profile.
+
+    Every profile runs on its own copy of the database so the real file
+    is never modified.
+
+    Args:
+        db_path: Database file to copy for the benchmark
+        writes: Number of single-row insert transactions
+        reads: Number of passes over READ_QUERIES
+
+    Returns:
+        list[dict]: One result per profile
+    """
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for profile in STORAGE_PROFILES:
+            #Fresh copy so profiles do not affect each other
+            copy_path = Path(tmp_dir) / f"{profile}.db"
+            copy_database(db_path, copy_path)
+            results.append(_benchmark_profile(copy_path, profile, writes, reads))
+
+    return results
+
+def print_benchmark(results):
+    """Print benchmark results as a table."""
+    print(f"{'Profile':<15} {'Writes/s':>12} {'Reads/s':>12}")
+    print("-" * 41)
+    for row in results:
+        print(f"{row['profile']:<15} {row['writes_per_sec']:>12.0f} {row['reads_per_sec']:>12.0f}")
+
+#Ensures that the benchmark runs only when file is executed directly
+if __name__ == "__main__":
+    print_benchmark(benchmark_storage_profiles())
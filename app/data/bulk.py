@@ -0,0 +1,98 @@
+#Ids per IN (...) lookup, kept below SQLite's bound parameter limit
+ID_CHUNK_SIZE = 500
+
+def existing_ids(conn, table, ids):
+    """
+    Return the subset of ids that exist in a table.
+
+    Args:
+        conn: Database connection
+        table: Table to look in
+        ids: Ids to check
+
+    Returns:
+        set: Ids found
+    """
+    ids = [int(row_id) for row_id in ids]
+    found = set()
+
+    #Primary key lookups in chunks
+    for start in range(0, len(ids), ID_CHUNK_SIZE):
+        chunk = ids[start:start + ID_CHUNK_SIZE]
+        placeholders = ", ".join("?" * len(chunk))
+        rows = conn.execute(f"SELECT id FROM {table} WHERE id IN ({placeholders})", chunk).fetchall()
+        found.update(row[0] for row in rows)
+
+    return found
+
+def bulk_insert(conn, table, columns, rows):
+    """
+    Insert many rows with one executemany call. The caller commits.
+
+    New ids are contiguous because the whole batch runs while this
+    connection holds the write lock, so they are derived from
+    last_insert_rowid() after the batch.
+
+    Args:
+        conn: Database connection
+        table: Destination table
+        columns: Column names matching the order of values in each row
+        rows: List of tuples
+
+    Returns:
+        list[int]: Id of each inserted row, in input order
+    """
+    if not rows:
+        return []
+
+    #Execute insert statement for every row
+    placeholders = ", ".join("?" * len(columns))
+    conn.executemany(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", rows)
+
+    #Ids of the batch end at the last inserted id
+    last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+    return list(range(last_id - len(rows) + 1, last_id + 1))
+
+def bulk_update(conn, table, column, value, ids):
+    """
+    Set one column to the same value for many ids with one executemany call. The caller commits.
+
+    Args:
+        conn: Database connection
+        table: Table to update
+        column: Column to set
+        value: New value
+        ids: Ids of the rows to update
+
+    Returns:
+        dict: id -> True if the row was updated, False if no row has that id
+    """
+    ids = [int(row_id) for row_id in ids]
+    found = existing_ids(conn, table, ids)
+
+    #Execute update statement for every id that exists
+    conn.executemany(f"UPDATE {table} SET {column} = ? WHERE id = ?",
+                     [(value, row_id) for row_id in ids if row_id in found])
+
+    return {row_id: row_id in found for row_id in ids}
+
+def bulk_delete(conn, table, ids):
+    """
+    Delete many ids with one executemany call. The caller commits.
+
+    Args:
+        conn: Database connection
+        table: Table to delete from
+        ids: Ids of the rows to delete
+
+    Returns:
+        dict: id -> True if the row was deleted, False if no row had that id
+    """
+    ids = [int(row_id) for row_id in ids]
+    found = existing_ids(conn, table, ids)
+
+    #Execute delete statement for every id that exists
+    conn.executemany(f"DELETE FROM {table} WHERE id = ?",
+                     [(row_id,) for row_id in ids if row_id in found])
+
+    return {row_id: row_id in found for row_id in ids}
@@ -0,0 +1,133 @@
+import functools
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+#Maximum number of results kept in memory (least recently used are evicted first)
+CACHE_SIZE = 256
+
+#Process-wide results shared by every Streamlit session: key -> (table versions, result)
+_results = OrderedDict()
+_results_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+def read_table_versions(conn, tables):
+    """
+    Read the write counters of some tables from table_versions.
+
+    The counters are bumped by triggers (see create_table_versions) in the
+    same transaction as the write. PRAGMA data_version is not used because
+    it only reports commits made by other connections and cannot tell
+    which table changed.
+
+    Args:
+        conn: Database connection
+        tables: Table names
+
+    Returns:
+        tuple: Version of each table, in the order given
+    """
+    placeholders = ", ".join("?" * len(tables))
+    rows = dict(conn.execute(
+        f"SELECT table_name, version FROM table_versions WHERE table_name IN ({placeholders})",
+        list(tables)).fetchall())
+    return tuple(rows.get(table, 0) for table in tables)
+
+def _database_file(conn):
+    """Return the file of a connection's main database, so results of different files never mix."""
+    #In-memory databases have no file and are private to their connection
+    return conn.execute("PRAGMA database_list").fetchone()[2] or f":memory:{id(conn)}"
+
+def _has_pending_writes(conn):
+    """
+    Tell if a connection may hold uncommitted changes.
+
+    Counters read inside a write transaction can be rolled back and reused
+    later for different data, so such reads are never cached. Read-only
+    snapshots (query_only connections) are safe.
+    """
+    return conn.in_transaction and not conn.execute("PRAGMA query_only").fetchone()[0]
+
+def _copy(result):
+    """Copy DataFrames (also inside dicts) so callers cannot change the cached result."""
+    if isinstance(result, pd.DataFrame):
+        return result.copy()
+    if isinstance(result, dict):
+        return {key: _copy(value) for key, value in result.items()}
+    return result
+
+def cached(*tables):
+    """
+    Cache a read function's results until one of the tables it reads is written.
+
+    The decorated function must take a connection as its first argument.
+    Results are keyed by function, database file and remaining arguments,
+    and are served while the tables' write counters still match the ones
+    read with the result.
+
+    Args:
+        tables: Tables the function reads (see VERSIONED_TABLES)
+
+    Returns:
+        Decorator for the read function
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(conn, *args, **kwargs):
+            #Never cache reads that could see uncommitted writes
+            if _has_pending_writes(conn):
+                return func(conn, *args, **kwargs)
+
+            key = (func.__module__, func.__qualname__, _database_file(conn),
+                   args, tuple(sorted(kwargs.items())))
+
+            #Arguments that cannot be a dict key (e.g. lists) are not cached
+            try:
+                hash(key)
+            except TypeError:
+                return func(conn, *args, **kwargs)
+
+            #Databases not yet migrated to table_versions are read without the cache
+            try:
+                versions = read_table_versions(conn, tables)
+            except sqlite3.OperationalError:
+                return func(conn, *args, **kwargs)
+
+            with _results_lock:
+                entry = _results.get(key)
+                #Current result: mark it as most recently used
+                if entry is not None and entry[0] == versions:
+                    _results.move_to_end(key)
+                    _stats["hits"] += 1
+                    return _copy(entry[1])
+                _stats["misses"] += 1
+
+            #Run the query outside the lock so other sessions are not blocked
+            result = func(conn, *args, **kwargs)
+
+            with _results_lock:
+                _results[key] = (versions, result)
+                _results.move_to_end(key)
+
+                #Evict least recently used results over the size limit
+                while len(_results) > CACHE_SIZE:
+                    _results.popitem(last=False)
+                    _stats["evictions"] += 1
+
+            return _copy(result)
+
+        return wrapper
+
+    return decorator
+
+def clear_cache():
+    """Remove every cached result."""
+    with _results_lock:
+        _results.clear()
+
+def cache_info():
+    """Return hits, misses, evictions and current number of cached results."""
+    with _results_lock:
+        return {**_stats, "size": len(_results)}
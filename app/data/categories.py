@@ -0,0 +1,118 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+#Category given to datasets that match no rule
+DEFAULT_CATEGORY = "General"
+
+#Rule table used to categorise datasets by name.
+#Rules are checked by priority (lowest first) and the first match wins.
+#Each rule matches either plain keywords or a regular expression, ignoring case.
+CATEGORY_RULES = [
+    {"priority": 10, "keywords": ["fraud"], "category": "Threat Intelligence"},
+    {"priority": 20, "keywords": ["server", "logs"], "category": "Network Logs"},
+    {"priority": 30, "keywords": ["churn", "customer"], "category": "Customer Analytics"},
+    {"priority": 40, "keywords": ["name", "classification"], "category": "Image Data"},
+    {"priority": 50, "keywords": ["salary", "hr"], "category": "HR Data"},
+]
+
+class CategoryRuleSet:
+    """Rule table compiled once and applied to whole columns of dataset names."""
+
+    #Initialise attributes
+    def __init__(self, rules=CATEGORY_RULES, default: str = DEFAULT_CATEGORY):
+        self.default = default
+        #Compiled (pattern, keywords, category) in priority order
+        self._compiled = []
+
+        for rule in sorted(rules, key=lambda r: r.get("priority", 0)):
+            #Keyword rules keep their lowercase keywords for fast substring search
+            if "regex" in rule:
+                keywords = None
+                pattern = rule["regex"]
+            else:
+                keywords = [keyword.lower() for keyword in rule["keywords"]]
+                pattern = "|".join(re.escape(keyword) for keyword in keywords)
+            self._compiled.append((re.compile(pattern, re.IGNORECASE), keywords, rule["category"]))
+
+    def categorize(self, name) -> str:
+        """Return the category of a single dataset name."""
+        if not isinstance(name, str):
+            return self.default
+
+        for pattern, _, category in self._compiled:
+            if pattern.search(name):
+                return category
+        return self.default
+
+    def categorize_series(self, names: pd.Series) -> pd.Series:
+        """
+        Return the category of every name in a Series in one vectorised pass.
+
+        Repeated names are only matched once.
+
+        Args:
+            names: Series of dataset names
+
+        Returns:
+            pd.Series: Categories aligned with names
+        """
+        #Work on distinct names only, then map back to every row
+        codes, uniques = pd.factorize(names, use_na_sentinel=True)
+
+        #Every name missing (e.g. an empty column in a chunk): nothing to match
+        if len(uniques) == 0:
+            return pd.Series(self.default, index=names.index, dtype=object)
+
+        unique_names = pd.Series(uniques, dtype=object).astype(str)
+        #Lowercase fixed-width array for numpy's C-level substring search
+        lowered = np.asarray(unique_names.str.lower().to_numpy(), dtype=str)
+
+        #One boolean mask per rule, first true mask wins
+        conditions = []
+        for pattern, keywords, _ in self._compiled:
+            if keywords is None:
+                conditions.append(unique_names.str.contains(pattern, na=False).to_numpy())
+            else:
+                mask = np.zeros(len(lowered), dtype=bool)
+                for keyword in keywords:
+                    mask |= np.char.find(lowered, keyword) >= 0
+                conditions.append(mask)
+        choices = [category for _, _, category in self._compiled]
+        unique_categories = np.select(conditions, choices, default=self.default) if conditions \
+            else np.full(len(unique_names), self.default, dtype=object)
+
+        #Missing names get the default category
+        categories = np.where(codes >= 0, np.asarray(unique_categories, dtype=object)[codes.clip(min=0)], self.default)
+        return pd.Series(categories, index=names.index, dtype=object)
+
+#Rule set built from CATEGORY_RULES, compiled on first use
+_default_rules = None
+
+def get_category_rules() -> CategoryRuleSet:
+    """Return the shared rule set compiled from CATEGORY_RULES."""
+    global _default_rules
+    if _default_rules is None:
+        _default_rules = CategoryRuleSet()
+    return _default_rules
+
+def assign_category(name) -> str:
+    """Assign a category to one dataset name using CATEGORY_RULES."""
+    return get_category_rules().categorize(name)
+
+def testing_functions():
+    """Helper to check the vectorised rules against the per-name rules when executed directly."""
+    rules = get_category_rules()
+    names = pd.Series(["Fraud Transactions", "Server Logs", None, "Customer Churn", "Weather", None])
+    expected = [rules.categorize(name) for name in names]
+    assert rules.categorize_series(names).tolist() == expected
+
+    #Columns with no names at all
+    assert rules.categorize_series(pd.Series([None, np.nan])).tolist() == [DEFAULT_CATEGORY] * 2
+    assert rules.categorize_series(pd.Series([], dtype=object)).tolist() == []
+    print(f"\n Categories: {expected}")
+
+#Ensures that 'testing_functions' runs only when file is executed directly
+if __name__ == "__main__":
+    testing_functions()
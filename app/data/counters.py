@@ -0,0 +1,39 @@
+from app.data.archive import source_table
+from app.data.schema import COUNTED_TABLES
+
+def get_domain_counts(conn, domain, include_archive=False):
+    """
+    Read the dashboard counters of a table from domain_counts.
+
+    The counters are kept current by triggers (see create_domain_counts_table),
+    so this is one primary key range lookup whatever the size of the table.
+    Archived rows are counted from the archive table's indexes.
+
+    Args:
+        conn: Database connection
+        domain: Counted table (cyber_incidents or it_tickets)
+        include_archive: Also count archived rows
+
+    Returns:
+        dict: total, open and high_critical row counts
+    """
+    row = conn.execute("""
+        SELECT COALESCE(SUM(count), 0),
+               COALESCE(SUM(CASE WHEN status = 'open' THEN count END), 0),
+               COALESCE(SUM(CASE WHEN level IN ('high', 'critical') THEN count END), 0)
+        FROM domain_counts
+        WHERE domain = ?
+        """, (domain,)).fetchone()
+
+    counts = {"total": row[0], "open": row[1], "high_critical": row[2]}
+
+    #source_table attaches the archive and names the union view only once the archive table exists
+    if source_table(conn, domain, include_archive) != domain:
+        level_key = f"{dict(COUNTED_TABLES)[domain]}_key"
+        #Only closed and resolved rows are archived, so the open count is unchanged
+        counts["total"] += conn.execute(f"SELECT COUNT(*) FROM archive.{domain}").fetchone()[0]
+        counts["high_critical"] += conn.execute(f"""
+            SELECT COUNT(*) FROM archive.{domain} WHERE {level_key} IN ('high', 'critical')
+            """).fetchone()[0]
+
+    return counts
@@ -1,110 +1,174 @@
 import pandas as pd
 from datetime import datetime
-from app.data.db import connect_database
+from app.data.db import connect_database, get_connection
+from app.data.cache import cached
+from app.data.bulk import bulk_delete, bulk_insert
+from app.data.categories import assign_category
+from app.data.facets import split_facets
+from app.data.frames import read_frame, select_list
+from app.data.pagination import PAGE_SIZE, get_id_range, read_page
+from app.data.registry import hot_query
+from app.data.series import read_series
 
 def insert_dataset(dataset_name, category, source, last_updated,
-                   record_count, column_count, file_size_mb="Unknown"):
-    """Insert new dataset metadata."""
-    #Connect to database
-    conn = connect_database()
+                   record_count, column_count, file_size_mb="Unknown", conn=None):
+    """Insert new dataset metadata (category is derived from the name when empty)."""
+    #Use the category rule table when no category is given
+    if not category:
+        category = assign_category(dataset_name)
+
+    #Join the caller's unit of work or borrow a pooled connection (saved when block exits)
+    with get_connection(conn=conn) as conn:
+        #Create cursor
+        cursor = conn.cursor()
+
+        #Execute insert statement
+        cursor.execute("""
+            INSERT INTO datasets_metadata
+            (dataset_name, category, source, last_updated,
+             record_count, column_count, file_size_mb)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (dataset_name, category, source, last_updated,
+                  record_count, column_count, file_size_mb))
+
+        #Get id of inserted dataset
+        dataset_id = cursor.lastrowid
 
-    #Create cursor
-    cursor = conn.cursor()
+    #Return dataset id
+    return dataset_id
 
-    #Execute insert statement
-    cursor.execute("""
-        INSERT INTO datasets_metadata
-        (dataset_name, category, source, last_updated,
-         record_count, column_count, file_size_mb)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (dataset_name, category, source, last_updated,
-              record_count, column_count, file_size_mb))
+def get_all_datasets(columns=None):
+    """
+    Get all datasets as a typed DataFrame.
 
-    #Save changes
-    conn.commit()
+    Args:
+        columns: Columns to read (None for every column)
 
-    #Get id of inserted dataset
-    dataset_id = cursor.lastrowid
+    Returns:
+        pd.DataFrame: Datasets newest first, with categorical and datetime columns
+    """
+    #Borrow pooled connection
+    with get_connection() as conn:
+        #Read only the requested columns into a typed DataFrame
+        df = read_frame(conn, f"SELECT {select_list('datasets_metadata', columns)} FROM datasets_metadata ORDER BY id DESC")
 
-    #Close connection
-    conn.close()
+    #Return DataFrame
+    return df
 
-    #Return dataset id
-    return dataset_id
+#Columns get_datasets_page can filter on
+DATASET_FILTER_COLUMNS = ["category", "source"]
 
-def get_all_datasets():
-    """Get all datasets as DataFrame."""
-    #Connect to database
-    conn = connect_database()
+@hot_query({}, {"cursor": 1000})
+def get_datasets_page(conn, page_size=PAGE_SIZE, cursor=None, filters=None, columns=None):
+    """
+    Get one page of datasets, newest first.
 
-    #Read data into DataFrame
-    df = pd.read_sql_query(
-        "SELECT * FROM datasets_metadata ORDER BY id DESC",
-        conn
-    )
+    Args:
+        conn: Database connection
+        page_size: Rows per page
+        cursor: Last id of the previous page (None for the first page)
+        filters: Optional dict of column -> value, columns from DATASET_FILTER_COLUMNS
+        columns: Columns to read (None for every column)
 
-    #Close connection
-    conn.close()
+    Returns:
+        tuple: (DataFrame of the page, cursor of the next page or None)
+    """
+    return read_page(conn, "datasets_metadata", page_size, cursor, filters, DATASET_FILTER_COLUMNS, columns)
 
-    #Return DataFrame
-    return df
+@hot_query()
+@cached("datasets_metadata")
+def get_dataset_count(conn):
+    """Return the number of datasets."""
+    return conn.execute("SELECT COUNT(*) FROM datasets_metadata").fetchone()[0]
+
+@hot_query()
+@cached("datasets_metadata")
+def get_dataset_id_range(conn):
+    """Return (smallest id, largest id) of datasets."""
+    return get_id_range(conn, "datasets_metadata")
 
 def update_dataset_record(conn, dataset_id, new_record_count):
     """Update record count of a dataset and refresh the last_updated date."""
-    #Connect to database
-    conn = connect_database()
-
-    #Create cursor
-    cursor = conn.cursor()
-
     #Generate today's date
     current_date = datetime.now().strftime("%Y-%m-%d")
 
-    #Execute update statement
-    cursor.execute("""
-        UPDATE datasets_metadata
-        SET record_count = ?, last_updated = ?
-        WHERE id = ?
-        """, 
-        (new_record_count, current_date, dataset_id))
+    #Join the caller's unit of work or borrow a pooled connection (saved when block exits)
+    with get_connection(conn=conn) as conn:
+        #Create cursor
+        cursor = conn.cursor()
 
-    #Save changes
-    conn.commit()
+        #Execute update statement
+        cursor.execute("""
+            UPDATE datasets_metadata
+            SET record_count = ?, last_updated = ?
+            WHERE id = ?
+            """,
+            (new_record_count, current_date, dataset_id))
 
-    #Get number of updated rows
-    row_count = cursor.rowcount
-
-    #Close connection
-    conn.close()
+        #Get number of updated rows
+        row_count = cursor.rowcount
 
     #Return number of updated rows
     return row_count
 
-def delete_dataset(dataset_id):
+def delete_dataset(dataset_id, conn=None):
     """Delete dataset by ID."""
-    # Connect to database
-    conn = connect_database()
+    #Join the caller's unit of work or borrow a pooled connection (saved when block exits)
+    with get_connection(conn=conn) as conn:
+        #Create cursor
+        cursor = conn.cursor()
 
-    #Create cursor
-    cursor = conn.cursor()
+        #Execute delete statement
+        cursor.execute("""
+                DELETE FROM datasets_metadata WHERE id = ?
+                """, (dataset_id,))
 
-    #Execute delete statement
-    cursor.execute("""
-            DELETE FROM datasets_metadata WHERE id = ?
-            """, (dataset_id,))
+        #Get number of deleted rows
+        row_count = cursor.rowcount
 
-    #Save changes
-    conn.commit()
+    #Return number of deleted rows
+    return row_count
 
-    #Get number of deleted rows
-    row_count = cursor.rowcount
+#Columns written by insert_datasets, in the order of each row tuple
+DATASET_INSERT_COLUMNS = ["dataset_name", "category", "source", "last_updated",
+                          "record_count", "column_count", "file_size_mb"]
 
-    #Close connection
-    conn.close()
+def insert_datasets(datasets, conn=None):
+    """
+    Insert many datasets in one transaction (category is derived from the name when empty).
 
-    #Return number of deleted rows
-    return row_count
+    Args:
+        datasets: List of dicts with the arguments of insert_dataset
+        conn: Connection of an open unit of work (optional)
+
+    Returns:
+        list[int]: Id of each new dataset, in input order
+    """
+    rows = [(ds["dataset_name"], ds.get("category") or assign_category(ds["dataset_name"]),
+             ds["source"], ds["last_updated"], ds["record_count"], ds["column_count"],
+             ds.get("file_size_mb", "Unknown")) for ds in datasets]
 
+    #Join the caller's unit of work or borrow a pooled connection (saved when block exits)
+    with get_connection(conn=conn) as conn:
+        return bulk_insert(conn, "datasets_metadata", DATASET_INSERT_COLUMNS, rows)
+
+def delete_datasets(dataset_ids, conn=None):
+    """
+    Delete many datasets in one transaction.
+
+    Args:
+        dataset_ids: Ids of the datasets to delete
+        conn: Connection of an open unit of work (optional)
+
+    Returns:
+        dict: dataset id -> True if deleted, False if not found
+    """
+    #Join the caller's unit of work or borrow a pooled connection (saved when block exits)
+    with get_connection(conn=conn) as conn:
+        return bulk_delete(conn, "datasets_metadata", dataset_ids)
+
+@hot_query()
+@cached("datasets_metadata")
 def get_datasets_by_category(conn):
     """
     Count datasets by category.
@@ -122,6 +186,8 @@ def get_datasets_by_category(conn):
     #Return dataframe
     return df
 
+@hot_query()
+@cached("datasets_metadata")
 def get_datasets_by_source(conn):
     """
     Count datasets by source.
@@ -136,6 +202,8 @@ def get_datasets_by_source(conn):
     df = pd.read_sql_query(query, conn)
     return df
 
+@hot_query()
+@cached("datasets_metadata")
 def get_large_datasets_by_source(conn):
     """
     Count large datasets by source.
@@ -154,6 +222,8 @@ def get_large_datasets_by_source(conn):
     #Return dataframe
     return df
 
+@hot_query()
+@cached("datasets_metadata")
 def get_large_columns_datasets(conn):
     """
     Count datasets where column count is greater than 10.
@@ -171,19 +241,31 @@ def get_large_columns_datasets(conn):
     #Return dataframe
     return df
 
-def get_datasets_over_time(conn):
-    """Count datasets per date"""
-    query = """
-    SELECT last_updated, COUNT(*) as count
-    FROM datasets_metadata
-    GROUP BY last_updated
-    ORDER BY last_updated ASC
+@cached("datasets_metadata")
+def get_dataset_series(conn, bucket="day", start=None, end=None):
     """
-    #Create dataframe
-    df = pd.read_sql_query(query, conn)
-    #Return dataframe
-    return df
+    Count datasets per hour, day, week or month of their last update date.
+
+    Buckets are computed in SQL from the indexed last_updated_ts column.
 
+    Args:
+        conn: Database connection
+        bucket: "hour", "day", "week" or "month"
+        start: Only count datasets at or after this date (optional)
+        end: Only count datasets before this date (optional)
+
+    Returns:
+        pd.DataFrame: last_updated (bucket start) and count, oldest first
+    """
+    return read_series(conn, "datasets_metadata", "last_updated_ts", "last_updated", bucket, start, end)
+
+@hot_query()
+def get_datasets_over_time(conn):
+    """Count datasets per day of their last update date ordered chronologically."""
+    return get_dataset_series(conn, bucket="day")
+
+@hot_query()
+@cached("datasets_metadata")
 def get_dataset_record_counts(conn):
     """
     Retrieve dataset names with their record counts ordered by size.
@@ -197,6 +279,8 @@ def get_dataset_record_counts(conn):
     df = pd.read_sql_query(query, conn)
     return df
 
+@hot_query()
+@cached("datasets_metadata")
 def get_dataset_column_counts(conn):
     """
     Retrieve dataset names with their column counts ordered by size.
@@ -210,6 +294,50 @@ def get_dataset_column_counts(conn):
     df = pd.read_sql_query(query, conn)
     return df
 
+#Columns read by get_dataset_facets, all held by idx_datasets_facets
+DATASET_FACET_COLUMNS = ["category", "source", "last_updated", "dataset_name", "record_count", "column_count"]
+
+@hot_query()
+@cached("datasets_metadata")
+def get_dataset_facets(conn, bucket="day", start=None, end=None):
+    """
+    Build every dataset chart (category, source, record and column counts) from one scan, plus the time series.
+
+    Args:
+        conn: Database connection
+        bucket: Time bucket of datasets_over_time ("hour", "day", "week" or "month")
+        start: Start of the datasets_over_time date range (optional)
+        end: End of the datasets_over_time date range (optional)
+
+    Returns:
+        dict: datasets_over_time, dataset_record_counts, dataset_column_counts,
+              datasets_by_category and datasets_by_source DataFrames
+    """
+    #Read the chart columns once from the covering facet index
+    query = f"""
+    SELECT {", ".join(DATASET_FACET_COLUMNS)}
+    FROM datasets_metadata
+    """
+    rows = pd.read_sql_query(query, conn)
+    rows["count"] = 1
+
+    #Regroup the rows into one count table per chart
+    facets = split_facets(rows, {
+        "datasets_by_category": "category",
+        "datasets_by_source": "source",
+    })
+
+    #Time series bucketed in SQL on the epoch timestamp index
+    facets["datasets_over_time"] = get_dataset_series(conn, bucket, start, end)
+
+    #Per-dataset sizes, largest first
+    facets["dataset_record_counts"] = rows[["dataset_name", "record_count"]] \
+        .sort_values("record_count", ascending=False, kind="stable").reset_index(drop=True)
+    facets["dataset_column_counts"] = rows[["dataset_name", "column_count"]] \
+        .sort_values("column_count", ascending=False, kind="stable").reset_index(drop=True)
+
+    return facets
+
 def testing_functions():
     """Helper to print dataset analytics when executed directly."""
     conn = connect_database()
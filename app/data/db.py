@@ -1,38 +1,430 @@
 import sqlite3
+import threading
+import queue
+from contextlib import contextmanager
 from pathlib import Path
 import os
+import time
+import tracemalloc
 import pandas as pd
 
+from app.data.categories import get_category_rules
+from app.data.schema import TIMESTAMP_COLUMNS, attach_archive, create_archive_tables, migrate
+
 DB_PATH = Path("DATA") / "intelligence_platform.db"
 
-def connect_database(db_path=DB_PATH):
+def get_archive_path(db_path=DB_PATH):
+    """Return the archive database file kept next to a database file (None for in-memory databases)."""
+    if str(db_path) == ":memory:":
+        return None
+    db_path = Path(db_path)
+    return db_path.with_name(f"{db_path.stem}_archive{db_path.suffix}")
+
+#Maximum number of connections kept open per database file
+POOL_SIZE = 8
+#Seconds to wait for a free connection before giving up
+POOL_TIMEOUT = 30.0
+
+#Named storage profiles applied with PRAGMA statements when a connection opens.
+#journal_mode is stored in the database file itself, so every profile uses WAL
+#to let dashboard readers keep going while CRUD forms or ingestion write.
+STORAGE_PROFILES = {
+    #Many short reads from Streamlit pages, occasional small writes
+    "dashboard": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -65536,        #64 MB page cache
+        "mmap_size": 268435456,      #256 MB memory-mapped reads
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    #Large CSV loads where speed matters more than surviving a power cut
+    "bulk_ingest": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -262144,       #256 MB page cache
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+        "busy_timeout": 30000,
+    },
+    #Every commit is flushed to disk before returning
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -16384,        #16 MB page cache
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+        "busy_timeout": 10000,
+    },
+}
+
+#Profile used by the connection pool when a call site does not choose one
+DEFAULT_PROFILE = "dashboard"
+
+def apply_storage_profile(conn, profile):
+    """
+    Apply the PRAGMA settings of a named storage profile to a connection.
+
+    Args:
+        conn: Database connection
+        profile: Key of STORAGE_PROFILES
+
+    Returns:
+        sqlite3.Connection: The same connection, configured
+    """
+    #Reject unknown profile names early
+    if profile not in STORAGE_PROFILES:
+        raise ValueError(f"Unknown storage profile '{profile}'. Choose from: {', '.join(STORAGE_PROFILES)}")
+
+    settings = STORAGE_PROFILES[profile]
+
+    #Wait for locks before running other PRAGMAs (journal_mode needs one)
+    conn.execute(f"PRAGMA busy_timeout = {int(settings['busy_timeout'])}")
+    conn.execute(f"PRAGMA journal_mode = {settings['journal_mode']}")
+    conn.execute(f"PRAGMA synchronous = {settings['synchronous']}")
+    conn.execute(f"PRAGMA cache_size = {int(settings['cache_size'])}")
+    conn.execute(f"PRAGMA mmap_size = {int(settings['mmap_size'])}")
+    conn.execute(f"PRAGMA temp_store = {settings['temp_store']}")
+    return conn
+
+def connect_database(db_path=DB_PATH, profile=None):
     """
     Connect to the SQLite database.
     Creates the database file if it doesn't exist.
 
     Args:
         db_path: Path to the database file
+        profile: Optional storage profile name (see STORAGE_PROFILES)
 
     Returns:
         sqlite3.Connection: Database connection object
     """
-    return sqlite3.connect(str(db_path))
+    conn = sqlite3.connect(str(db_path))
 
-#CSV loading function
-def load_csv_to_table(conn, csv_path, table_name):
-  #Checks if CSV file exists
-  if os.path.exists(csv_path):
-    #Print success message
-    print(f"Success: CSV file was found at {csv_path}")
-  else:
-    #Print error message
-    print(f"Error: No CSV file was found at {csv_path}")
-    #No rows were loaded into SQL table
-    return 0
+    #Configure storage settings if a profile was requested
+    if profile:
+        apply_storage_profile(conn, profile)
 
-  #Read CSV file using pandas
-  df = pd.read_csv(csv_path)
+    return conn
+
+class ConnectionPool:
+    """
+    Bounded pool of SQLite connections shared by all threads.
+
+    Each thread checks out at most one connection at a time. Nested
+    checkouts on the same thread reuse that connection, so a data function
+    called inside another one joins the outer unit of work.
+    """
+
+    #Initialise attributes
+    def __init__(self, db_path=DB_PATH, profile: str = DEFAULT_PROFILE,
+                 max_size: int = POOL_SIZE, timeout: float = POOL_TIMEOUT, read_only: bool = False):
+        self.db_path = db_path
+        self.profile = profile
+        self.read_only = read_only
+        self.max_size = max_size
+        self.timeout = timeout
+        #Idle connections ready to be handed out
+        self._idle = queue.LifoQueue(maxsize=max_size)
+        #Limits the number of connections checked out at the same time
+        self._slots = threading.BoundedSemaphore(max_size)
+        #Connection currently held by each thread
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _new_connection(self) -> sqlite3.Connection:
+        #Pooled connections move between threads, so disable the same-thread check
+        conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        apply_storage_profile(conn, self.profile)
+
+        #Attach the archive after the profile (changing temp_store drops TEMP views)
+        archive_path = get_archive_path(self.db_path)
+        if archive_path is not None:
+            attach_archive(conn, archive_path)
+            conn.execute(f"PRAGMA archive.journal_mode = {STORAGE_PROFILES[self.profile]['journal_mode']}")
+
+        #Read-only pools reject any write at the SQLite level
+        if self.read_only:
+            conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    @staticmethod
+    def _is_healthy(conn: sqlite3.Connection) -> bool:
+        """Check that an idle connection can still run a statement."""
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _acquire(self) -> sqlite3.Connection:
+        #Wait for a free slot so the pool never grows past max_size
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError(f"No database connection available after {self.timeout}s")
+
+        try:
+            #Reuse an idle connection if it passes the health check
+            while True:
+                try:
+                    conn = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._new_connection()
+
+                if self._is_healthy(conn):
+                    return conn
+                conn.close()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _release(self, conn: sqlite3.Connection):
+        try:
+            #Never hand out a connection with a half-finished transaction
+            if conn.in_transaction:
+                conn.rollback()
+
+            if self._closed:
+                conn.close()
+            else:
+                self._idle.put_nowait(conn)
+        except (sqlite3.Error, queue.Full):
+            conn.close()
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        """
+        Check out a connection for the current thread.
+
+        Changes are committed when the outermost block exits normally and
+        rolled back if it raises.
+
+        Yields:
+            sqlite3.Connection: Pooled database connection
+        """
+        #Reuse the connection already held by this thread
+        held = getattr(self._local, "conn", None)
+        if held is not None:
+            self._local.depth += 1
+            try:
+                yield held
+            finally:
+                self._local.depth -= 1
+            return
+
+        conn = self._acquire()
+        self._local.conn = conn
+        self._local.depth = 1
+        try:
+            yield conn
+            #Save changes made inside the block
+            if conn.in_transaction:
+                conn.commit()
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            self._local.conn = None
+            self._local.depth = 0
+            self._release(conn)
+
+    def close(self):
+        """Close every idle connection and refuse to keep returned ones."""
+        with self._lock:
+            self._closed = True
+            while True:
+                try:
+                    self._idle.get_nowait().close()
+                except queue.Empty:
+                    break
+
+#One pool per database file, storage profile and access mode
+_pools = {}
+_pools_lock = threading.RLock()
+
+def get_pool(db_path=DB_PATH, profile=DEFAULT_PROFILE, read_only=False) -> ConnectionPool:
+    """Return the shared connection pool for a database file and profile."""
+    key = (str(db_path), profile, read_only)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is not None:
+            return pool
+
+        if read_only:
+            #Read-only connections cannot migrate, so let the writable pool do it
+            get_pool(db_path, profile)
+            pool = ConnectionPool(db_path, profile, read_only=True)
+        else:
+            pool = ConnectionPool(db_path, profile)
+            #Bring the schema up to date once per process (returns at once if current)
+            with pool.connection() as conn:
+                migrate(conn)
+                #Mirror the archived tables in the archive database
+                if get_archive_path(db_path) is not None:
+                    create_archive_tables(conn)
+        _pools[key] = pool
+
+    #Every page reaches the app database through here, so the background maintenance
+    #starts with its first pool (imported here because maintenance imports this module)
+    if not read_only and Path(db_path) == DB_PATH:
+        from app.data.maintenance import start_maintenance_scheduler
+        start_maintenance_scheduler(db_path=db_path)
+    return pool
+
+@contextmanager
+def get_connection(db_path=DB_PATH, profile=DEFAULT_PROFILE, conn=None):
+    """
+    Borrow a pooled connection to the SQLite database.
+
+    Args:
+        db_path: Path to the database file
+        profile: Storage profile name (see STORAGE_PROFILES)
+        conn: Connection supplied by the caller. It is used as is and
+              the caller decides when to commit.
+
+    Yields:
+        sqlite3.Connection: Database connection object
+    """
+    #Join the caller's unit of work
+    if conn is not None:
+        yield conn
+        return
+
+    with get_pool(db_path, profile).connection() as pooled:
+        yield pooled
+
+@contextmanager
+def transaction(db_path=DB_PATH, profile=DEFAULT_PROFILE):
+    """
+    Run several inserts, updates and deletes as one unit of work.
+
+    The write lock is taken up front and everything done in the block,
+    whether through the yielded connection or through data functions
+    called on the same thread, is committed once when the block exits
+    (one fsync) or rolled back if it raises. Nested blocks join the
+    outer transaction.
+
+    Args:
+        db_path: Path to the database file
+        profile: Storage profile name (see STORAGE_PROFILES)
+
+    Yields:
+        sqlite3.Connection: Connection inside the transaction
+    """
+    with get_pool(db_path, profile).connection() as conn:
+        #Start the transaction unless an outer block already did
+        if not conn.in_transaction:
+            conn.execute("BEGIN IMMEDIATE")
+        yield conn
+
+@contextmanager
+def atomic(conn, name="load"):
+    """
+    Make a block of writes on a connection all-or-nothing without touching the caller's transaction.
+
+    With no transaction open the block gets its own, committed when it
+    exits or rolled back if it raises. Inside a caller's transaction a
+    savepoint is used instead: a failure undoes only this block's writes
+    and everything is committed (or rolled back) by the caller.
 
+    Args:
+        conn: Database connection
+        name: Savepoint name used when nested
+
+    Yields:
+        sqlite3.Connection: The same connection
+    """
+    #Only the code that opened the transaction may end it
+    owns_tx = not conn.in_transaction
+    conn.execute("BEGIN" if owns_tx else f"SAVEPOINT {name}")
+
+    try:
+        yield conn
+    except BaseException:
+        if owns_tx:
+            conn.rollback()
+        else:
+            conn.execute(f"ROLLBACK TO {name}")
+            conn.execute(f"RELEASE {name}")
+        raise
+
+    if owns_tx:
+        conn.commit()
+    else:
+        conn.execute(f"RELEASE {name}")
+
+@contextmanager
+def read_snapshot(db_path=DB_PATH, profile=DEFAULT_PROFILE):
+    """
+    Run several read queries against one consistent view of the database.
+
+    Uses a dedicated read-only connection and keeps a single read
+    transaction open for the whole block. In WAL mode writers are not
+    blocked while the snapshot is open, and every query inside the block
+    sees the same data. Nested blocks on the same thread share the snapshot.
+
+    Args:
+        db_path: Path to the database file
+        profile: Storage profile name (see STORAGE_PROFILES)
+
+    Yields:
+        sqlite3.Connection: Read-only connection inside the read transaction
+    """
+    with get_pool(db_path, profile, read_only=True).connection() as conn:
+        #Join the snapshot already open on this thread
+        if conn.in_transaction:
+            yield conn
+            return
+
+        #The snapshot is fixed by the first read after BEGIN
+        conn.execute("BEGIN")
+        try:
+            yield conn
+        finally:
+            #Nothing to save, just end the read transaction
+            if conn.in_transaction:
+                conn.rollback()
+
+def run_snapshot(queries, db_path=DB_PATH):
+    """
+    Run a batch of query functions inside one read snapshot.
+
+    Args:
+        queries: Dict of name -> function taking a connection (e.g. get_incidents_by_status)
+        db_path: Path to the database file
+
+    Returns:
+        dict: name -> result of each query function
+    """
+    with read_snapshot(db_path) as conn:
+        return {name: query(conn) for name, query in queries.items()}
+
+def close_all_pools():
+    """Close all pooled connections (used on shutdown)."""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
+
+#Default number of CSV rows read per chunk in streaming mode
+CSV_CHUNK_SIZE = 50000
+
+def prepare_csv_frame(df, table_name):
+  """
+  Rename CSV columns and fill missing ones so the DataFrame matches the table.
+
+  Used for whole files and for each chunk in streaming mode.
+
+  Args:
+      df: DataFrame read from the CSV file
+      table_name: Destination table
+
+  Returns:
+      pd.DataFrame: DataFrame ready to be inserted
+  """
   #Rename columns for cyber_incidents table
   if table_name == "cyber_incidents":
     df = df.rename(columns = {
@@ -56,40 +448,8 @@ def load_csv_to_table(conn, csv_path, table_name):
       "columns" : "column_count",
     })
 
-    #Function to assign category based on dataset name
-    def assign_category(name):
-      #Make name lowercase to prevent case sensitivity errors
-      name = name.lower()
-      #Verify if fraud is in name
-      if "fraud" in name:
-        #Assign category
-        return "Threat Intelligence"
-      
-      #Verify if server or logs is in name
-      if "server" in name or "logs" in name:
-        #Assign category
-        return "Network Logs"
-      
-      #Verify if churn or customer is in name
-      if "churn" in name or "customer" in name:
-        #Assign category
-        return "Customer Analytics"
-      
-      #Verify if name or classification is in name
-      if "name" in name or "classification" in name:
-        #Assign category
-        return "Image Data"
-      
-      #Verify if salary or hr is in name
-      if "salary" in name or "hr" in name:
-        #Assign category
-        return "HR Data"
-      
-      #Assign category as General if no keywords found
-      return "General"
-    
-    #Apply function to dataset_name column to create category column
-    df["category"] = df["dataset_name"].apply(assign_category)
+    #Assign category from dataset name with the compiled rule table (vectorised)
+    df["category"] = get_category_rules().categorize_series(df["dataset_name"])
 
     #Missing columns handling
     if "file_size_mb" not in df.columns:
@@ -100,10 +460,16 @@ def load_csv_to_table(conn, csv_path, table_name):
   if table_name == "it_tickets":
     df = df.rename(columns={
       "ticket_id" : "id",
-      "resolution_time_hours" : "resolved_date",
+      "resolution_time_hours" : "resolution_hours",
       "created_at" : "created_date",
     })
 
+    #Resolved date is the creation date plus the time taken to resolve
+    if "resolution_hours" in df.columns and "resolved_date" not in df.columns:
+      hours = pd.to_numeric(df["resolution_hours"], errors = "coerce")
+      created = pd.to_datetime(df["created_date"], format = "ISO8601", errors = "coerce")
+      df["resolved_date"] = (created + pd.to_timedelta(hours, unit = "h")).dt.strftime("%Y-%m-%d %H:%M:%S")
+
     #Missing columns handling
     if "category" not in df.columns:
       #Insert category column with default data
@@ -113,6 +479,161 @@ def load_csv_to_table(conn, csv_path, table_name):
       #Insert subject column with default data
       df["subject"] = "No Subject"
 
+  #Epoch copies of the date columns, computed here so the insert triggers have nothing to fill
+  for table, source, column in TIMESTAMP_COLUMNS:
+    if table == table_name and source in df.columns:
+      df[column] = to_epoch_seconds(df[source])
+
+  return df
+
+def to_epoch_seconds(values):
+  """Convert a Series of date text to integer epoch seconds (invalid dates become missing)."""
+  parsed = pd.to_datetime(values, format="ISO8601", errors="coerce")
+  return ((parsed - pd.Timestamp("1970-01-01")) // pd.Timedelta(seconds=1)).astype("Int64")
+
+def frame_to_rows(df):
+  """Convert a DataFrame into a list of tuples of plain Python values (NaN becomes None)."""
+  #object dtype turns numpy scalars into Python ints/floats that sqlite3 can bind
+  values = df.astype(object).where(df.notna(), None)
+  return list(values.itertuples(index=False, name=None))
+
+def insert_frame(cursor, table_name, df, upsert=False):
+  """
+  Insert every row of a DataFrame with a single executemany call.
+
+  Args:
+      cursor: Cursor of the connection that owns the transaction
+      table_name: Destination table
+      df: DataFrame whose columns match the table columns
+      upsert: Update rows whose id already exists instead of failing
+
+  Returns:
+      int: Number of rows written
+  """
+  return insert_rows(cursor, table_name, list(df.columns), frame_to_rows(df), upsert)
+
+def insert_rows(cursor, table_name, columns, rows, upsert=False):
+  """
+  Insert a list of row tuples with a single executemany call.
+
+  Args:
+      cursor: Cursor of the connection that owns the transaction
+      table_name: Destination table
+      columns: Column names matching the order of values in each row
+      rows: List of tuples
+      upsert: Update rows whose id already exists instead of failing
+
+  Returns:
+      int: Number of rows written
+  """
+  column_list = ", ".join(f'"{column}"' for column in columns)
+  placeholders = ", ".join("?" for _ in columns)
+  query = f"INSERT INTO {table_name} ({column_list}) VALUES ({placeholders})"
+
+  #Overwrite existing rows with the same id
+  if upsert and "id" in columns:
+    updates = ", ".join(f'"{column}" = excluded."{column}"' for column in columns if column != "id")
+    query += f" ON CONFLICT(id) DO UPDATE SET {updates}" if updates else " ON CONFLICT(id) DO NOTHING"
+
+  cursor.executemany(query, rows)
+  return len(rows)
+
+def stream_csv_to_table(conn, csv_path, table_name, chunksize=CSV_CHUNK_SIZE):
+  """
+  Load a CSV file in bounded chunks inside one transaction.
+
+  Memory use depends on chunksize, not on the size of the file. Either every
+  chunk is saved or, if one fails, none of them are. Inside a transaction
+  the caller already opened, the caller decides when to commit.
+
+  Args:
+      conn: Database connection
+      csv_path: Path to the CSV file
+      table_name: Destination table
+      chunksize: Number of CSV rows read per chunk
+
+  Returns:
+      dict: rows, seconds, rows_per_sec and peak_memory_mb of the load
+  """
+  #Track peak memory of the load (unless the caller is already tracing)
+  started_tracing = not tracemalloc.is_tracing()
+  if started_tracing:
+    tracemalloc.start()
+  tracemalloc.reset_peak()
+
+  start = time.perf_counter()
+  rows_count = 0
+  cursor = conn.cursor()
+
+  try:
+    #One transaction for the whole file (a savepoint inside the caller's transaction),
+    #saved when every chunk is written and undone if any chunk fails
+    with atomic(conn, "stream_csv"):
+      #Read, transform and write one chunk at a time
+      for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+        chunk = prepare_csv_frame(chunk, table_name)
+        rows_count += insert_frame(cursor, table_name, chunk)
+  finally:
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    if started_tracing:
+      tracemalloc.stop()
+
+  seconds = time.perf_counter() - start
+
+  return {
+    "rows": rows_count,
+    "seconds": seconds,
+    "rows_per_sec": rows_count / seconds if seconds else 0.0,
+    "peak_memory_mb": peak_bytes / (1024 * 1024),
+  }
+
+#CSV loading function
+def load_csv_to_table(conn, csv_path, table_name, chunksize=None):
+  """
+  Load a CSV file into a table.
+
+  Args:
+      conn: Database connection
+      csv_path: Path to the CSV file
+      table_name: Destination table
+      chunksize: Rows per chunk; when given the file is streamed instead of
+          being read into memory at once
+
+  Returns:
+      int: Number of rows loaded
+  """
+  #Checks if CSV file exists
+  if os.path.exists(csv_path):
+    #Print success message
+    print(f"Success: CSV file was found at {csv_path}")
+  else:
+    #Print error message
+    print(f"Error: No CSV file was found at {csv_path}")
+    #No rows were loaded into SQL table
+    return 0
+
+  #Streaming mode for files too large to hold in memory
+  if chunksize:
+    #Error handling
+    try:
+      stats = stream_csv_to_table(conn, csv_path, table_name, chunksize)
+    except Exception as e:
+      #Print error message
+      print(e)
+      #No rows added since the transaction was rolled back
+      return 0
+
+    #Print success message with load statistics
+    print(f"{stats['rows']} added from {csv_path} to {table_name} "
+          f"({stats['rows_per_sec']:.0f} rows/s, peak memory {stats['peak_memory_mb']:.1f} MB)")
+    return stats["rows"]
+
+  #Read CSV file using pandas
+  df = pd.read_csv(csv_path)
+
+  #Rename columns and fill defaults for destination table
+  df = prepare_csv_frame(df, table_name)
+
   #Error handling
   try:
     #Insert data into sql table
@@ -126,4 +647,4 @@ def load_csv_to_table(conn, csv_path, table_name):
     return 0
 
   #Number of rows loaded into sql table is returned
-  return rows_count
\ No newline at end of file
+  return rows_count
@@ -0,0 +1,69 @@
+import pandas as pd
+
+#Columns of each domain table that read functions may select
+TABLE_COLUMNS = {
+    "cyber_incidents": ["id", "date", "incident_type", "severity", "status",
+                        "description", "reported_by", "created_at"],
+    "it_tickets": ["id", "priority", "status", "category", "subject", "description",
+                   "created_date", "resolved_date", "assigned_to", "created_at", "resolution_hours"],
+    "datasets_metadata": ["id", "dataset_name", "category", "source", "last_updated",
+                          "record_count", "column_count", "file_size_mb", "created_at"],
+}
+
+#Low-cardinality text columns stored as pandas categoricals
+CATEGORICAL_COLUMNS = {"severity", "status", "priority", "category", "incident_type"}
+
+#Date and timestamp text columns parsed into datetime64
+DATETIME_COLUMNS = {"date", "created_date", "resolved_date", "last_updated", "created_at"}
+
+def select_list(table, columns=None):
+    """
+    Build the SELECT list of a read query from a list of column names.
+
+    Args:
+        table: Table being read
+        columns: Column names to read (None for every column)
+
+    Returns:
+        str: Comma separated column list for the query
+    """
+    #Every column
+    if columns is None:
+        return ", ".join(TABLE_COLUMNS[table])
+
+    #Only known columns are put into the SQL
+    unknown = [column for column in columns if column not in TABLE_COLUMNS[table]]
+    if unknown:
+        raise ValueError(f"Unknown column(s) for {table}: {', '.join(unknown)}")
+
+    #Keep id so rows can still be identified and paginated
+    if "id" not in columns:
+        columns = ["id", *columns]
+
+    return ", ".join(columns)
+
+def typed_frame(df):
+    """
+    Convert the text columns of a domain DataFrame to compact dtypes.
+
+    Status-like columns become categoricals (one small code per row instead
+    of a Python string) and date columns are parsed into datetime64.
+
+    Args:
+        df: DataFrame read from a domain table
+
+    Returns:
+        pd.DataFrame: Same DataFrame with converted columns
+    """
+    for column in df.columns:
+        if column in CATEGORICAL_COLUMNS:
+            df[column] = df[column].astype("category")
+        elif column in DATETIME_COLUMNS:
+            #Unparseable values become NaT rather than failing the whole read
+            df[column] = pd.to_datetime(df[column], format="ISO8601", errors="coerce")
+
+    return df
+
+def read_frame(conn, query, params=()):
+    """Run a read query and return its result as a typed DataFrame."""
+    return typed_frame(pd.read_sql_query(query, conn, params=params))
@@ -1,109 +1,184 @@
 import pandas as pd
-from app.data.db import connect_database
-
-def insert_incident(date, incident_type, severity, status, description, reported_by=None):
+from app.data.db import connect_database, get_connection
+from app.data.archive import source_table
+from app.data.cache import cached
+from app.data.bulk import bulk_delete, bulk_insert, bulk_update
+from app.data.counters import get_domain_counts
+from app.data.facets import read_facets
+from app.data.frames import read_frame, select_list
+from app.data.pagination import PAGE_SIZE, get_id_range, read_page
+from app.data.registry import hot_query
+from app.data.search import SEARCH_LIMIT, search_table
+from app.data.series import read_series
+
+def insert_incident(date, incident_type, severity, status, description, reported_by=None, conn=None):
     """Insert new incident."""
-    #Connect to database
-    conn = connect_database()
-
-    #Create cursor
-    cursor = conn.cursor()
+    #Join the caller's unit of work or borrow a pooled connection (saved when block exits)
+    with get_connection(conn=conn) as conn:
+        #Create cursor
+        cursor = conn.cursor()
 
-    #Execute insert statement
-    cursor.execute("""
-        INSERT INTO cyber_incidents
-        (date, incident_type, severity, status, description, reported_by)
-        VALUES (?, ?, ?, ?, ?, ?)
-        """, (date, incident_type, severity, status, description, reported_by))
-    
-    #Save changes
-    conn.commit()
+        #Execute insert statement
+        cursor.execute("""
+            INSERT INTO cyber_incidents
+            (date, incident_type, severity, status, description, reported_by)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """, (date, incident_type, severity, status, description, reported_by))
 
-    #Get id of inserted incident
-    incident_id = cursor.lastrowid
-
-    #Close connection
-    conn.close()
+        #Get id of inserted incident
+        incident_id = cursor.lastrowid
 
     #Return incident id
     return incident_id
 
-def get_all_incidents():
-    """Get all incidents as DataFrame."""
-    #Connect to database
-    conn = connect_database()
+def get_all_incidents(columns=None, include_archive=False):
+    """
+    Get all incidents as a typed DataFrame.
 
-    #Read data into DataFrame
-    df = pd.read_sql_query(
-        "SELECT * FROM cyber_incidents ORDER BY id DESC",
-        conn
-    )
+    Args:
+        columns: Columns to read (None for every column)
+        include_archive: Also return archived incidents
 
-    #Close connection
-    conn.close()
+    Returns:
+        pd.DataFrame: Incidents newest first, with categorical and datetime columns
+    """
+    #Borrow pooled connection
+    with get_connection() as conn:
+        #Read only the requested columns into a typed DataFrame
+        df = read_frame(conn, f"SELECT {select_list('cyber_incidents', columns)} "
+                              f"FROM {source_table(conn, 'cyber_incidents', include_archive)} ORDER BY id DESC")
 
     #Return DataFrame
     return df
 
-def update_incident(conn, incident_id, new_status):
-    """Update incident status of an incident"""
-    #Connect to database
-    conn = connect_database()
+#Columns get_incidents_page can filter on
+INCIDENT_FILTER_COLUMNS = ["status", "severity", "incident_type", "reported_by"]
+
+@hot_query({}, {"cursor": 1000}, {"include_archive": True})
+def get_incidents_page(conn, page_size=PAGE_SIZE, cursor=None, filters=None, columns=None, include_archive=False):
+    """
+    Get one page of incidents, newest first.
+
+    Args:
+        conn: Database connection
+        page_size: Rows per page
+        cursor: Last id of the previous page (None for the first page)
+        filters: Optional dict of column -> value, columns from INCIDENT_FILTER_COLUMNS
+        columns: Columns to read (None for every column)
+        include_archive: Also page through archived incidents
+
+    Returns:
+        tuple: (DataFrame of the page, cursor of the next page or None)
+    """
+    return read_page(conn, "cyber_incidents", page_size, cursor, filters, INCIDENT_FILTER_COLUMNS, columns,
+                     source_table(conn, "cyber_incidents", include_archive))
 
-    #Create cursor
-    cursor = conn.cursor()
+@hot_query()
+@cached("cyber_incidents")
+def get_incident_id_range(conn):
+    """Return (smallest id, largest id) of incidents."""
+    return get_id_range(conn, "cyber_incidents")
 
-    #Execute update statement
-    cursor.execute("""
-        UPDATE cyber_incidents SET status = ? WHERE id = ?
-        """, (new_status, incident_id))
-    
-    #Save changes
-    conn.commit()
+def update_incident(conn, incident_id, new_status):
+    """Update incident status of an incident"""
+    #Join the caller's unit of work or borrow a pooled connection (saved when block exits)
+    with get_connection(conn=conn) as conn:
+        #Create cursor
+        cursor = conn.cursor()
 
-    #Get number of updated rows
-    row_count = cursor.rowcount
+        #Execute update statement
+        cursor.execute("""
+            UPDATE cyber_incidents SET status = ? WHERE id = ?
+            """, (new_status, incident_id))
 
-    #Close connection
-    conn.close()
+        #Get number of updated rows
+        row_count = cursor.rowcount
 
     #Return number of updated rows
     return row_count
 
-def delete_incident(incident_id):
+def delete_incident(incident_id, conn=None):
     """Delete incident by ID."""
-    # Connect to database
-    conn = connect_database()
-
-    #Create cursor
-    cursor = conn.cursor()
+    #Join the caller's unit of work or borrow a pooled connection (saved when block exits)
+    with get_connection(conn=conn) as conn:
+        #Create cursor
+        cursor = conn.cursor()
 
-    #Execute delete statement
-    cursor.execute("""
-            DELETE FROM cyber_incidents WHERE id = ?
-            """, (incident_id,))
-    
-    #Save changes
-    conn.commit()
+        #Execute delete statement
+        cursor.execute("""
+                DELETE FROM cyber_incidents WHERE id = ?
+                """, (incident_id,))
 
-    #Get number of deleted rows
-    row_count = cursor.rowcount
-
-    #Close connection
-    conn.close()
+        #Get number of deleted rows
+        row_count = cursor.rowcount
 
     #Return number of deleted rows
     return row_count
 
-def get_incidents_by_type_count(conn):
+#Columns written by insert_incidents, in the order of each row tuple
+INCIDENT_INSERT_COLUMNS = ["date", "incident_type", "severity", "status", "description", "reported_by"]
+
+def insert_incidents(incidents, conn=None):
+    """
+    Insert many incidents in one transaction.
+
+    Args:
+        incidents: List of dicts with the arguments of insert_incident
+        conn: Connection of an open unit of work (optional)
+
+    Returns:
+        list[int]: Id of each new incident, in input order
+    """
+    rows = [(inc["date"], inc["incident_type"], inc["severity"], inc["status"],
+             inc["description"], inc.get("reported_by")) for inc in incidents]
+
+    #Join the caller's unit of work or borrow a pooled connection (saved when block exits)
+    with get_connection(conn=conn) as conn:
+        return bulk_insert(conn, "cyber_incidents", INCIDENT_INSERT_COLUMNS, rows)
+
+def update_incidents_status(incident_ids, new_status, conn=None):
+    """
+    Set the status of many incidents in one transaction.
+
+    Args:
+        incident_ids: Ids of the incidents to update
+        new_status: Status given to every incident
+        conn: Connection of an open unit of work (optional)
+
+    Returns:
+        dict: incident id -> True if updated, False if not found
+    """
+    #Join the caller's unit of work or borrow a pooled connection (saved when block exits)
+    with get_connection(conn=conn) as conn:
+        return bulk_update(conn, "cyber_incidents", "status", new_status, incident_ids)
+
+def delete_incidents(incident_ids, conn=None):
+    """
+    Delete many incidents in one transaction.
+
+    Args:
+        incident_ids: Ids of the incidents to delete
+        conn: Connection of an open unit of work (optional)
+
+    Returns:
+        dict: incident id -> True if deleted, False if not found
+    """
+    #Join the caller's unit of work or borrow a pooled connection (saved when block exits)
+    with get_connection(conn=conn) as conn:
+        return bulk_delete(conn, "cyber_incidents", incident_ids)
+
+@hot_query({}, {"include_archive": True})
+@cached("cyber_incidents")
+def get_incidents_by_type_count(conn, include_archive=False):
     """
     Count incidents by type.
+    Pass include_archive=True to also count archived incidents.
     Uses: SELECT, FROM, GROUP BY, ORDER BY
     """
     #Select only incident types and regroup by it
-    query = """
+    query = f"""
     SELECT incident_type, COUNT(*) as count
-    FROM cyber_incidents
+    FROM {source_table(conn, "cyber_incidents", include_archive, ["incident_type"])}
     GROUP BY incident_type
     ORDER BY count DESC
     """
@@ -112,27 +187,41 @@ def get_incidents_by_type_count(conn):
     #Return dataframe
     return df
 
-def get_incidents_over_time(conn):
-    """Count incidents per reporting date ordered chronologically."""
-    query = """
-    SELECT date, COUNT(*) as count
-    FROM cyber_incidents
-    GROUP BY date
-    ORDER BY date ASC
+@cached("cyber_incidents")
+def get_incident_series(conn, bucket="day", start=None, end=None, include_archive=False):
     """
-    #Create dataframe
-    df = pd.read_sql_query(query, conn)
-    #Return dataframe
-    return df
+    Count incidents per hour, day, week or month of their reporting date.
+
+    Buckets are computed in SQL from the indexed date_ts column.
+
+    Args:
+        conn: Database connection
+        bucket: "hour", "day", "week" or "month"
+        start: Only count incidents at or after this date (optional)
+        end: Only count incidents before this date (optional)
+        include_archive: Also count archived incidents
+
+    Returns:
+        pd.DataFrame: date (bucket start) and count, oldest first
+    """
+    return read_series(conn, "cyber_incidents", "date_ts", "date", bucket, start, end, include_archive)
+
+@hot_query()
+def get_incidents_over_time(conn):
+    """Count incidents per day of their reporting date ordered chronologically."""
+    return get_incident_series(conn, bucket="day")
 
-def get_incidents_by_status(conn):
+@hot_query({}, {"include_archive": True})
+@cached("cyber_incidents")
+def get_incidents_by_status(conn, include_archive=False):
     """
     Count incidents by status.
+    Pass include_archive=True to also count archived incidents.
     Uses: SELECT, FROM, GROUP BY, ORDER BY
     """
-    query = """
+    query = f"""
     SELECT status, COUNT(*) as count
-    FROM cyber_incidents
+    FROM {source_table(conn, "cyber_incidents", include_archive, ["status"])}
     GROUP BY status
     ORDER BY count DESC
     """
@@ -141,14 +230,17 @@ def get_incidents_by_status(conn):
     #Return dataframe
     return df
 
-def get_incidents_by_severity(conn):
+@hot_query({}, {"include_archive": True})
+@cached("cyber_incidents")
+def get_incidents_by_severity(conn, include_archive=False):
     """
     Count incidents by severity.
+    Pass include_archive=True to also count archived incidents.
     Uses: SELECT, FROM, GROUP BY, ORDER BY
     """
-    query = """
+    query = f"""
     SELECT severity, COUNT(*) as count
-    FROM cyber_incidents
+    FROM {source_table(conn, "cyber_incidents", include_archive, ["severity"])}
     GROUP BY severity
     ORDER BY count DESC
     """
@@ -157,15 +249,18 @@ def get_incidents_by_severity(conn):
     #Return dataframe
     return df
 
-def get_high_severity_by_status(conn):
+@hot_query({}, {"include_archive": True})
+@cached("cyber_incidents")
+def get_high_severity_by_status(conn, include_archive=False):
     """
     Count high severity incidents by status.
+    Pass include_archive=True to also count archived incidents.
     Uses: SELECT, FROM, WHERE, GROUP BY, ORDER BY
     """
-    query = """
+    query = f"""
     SELECT status, COUNT(*) as count
-    FROM cyber_incidents
-    WHERE severity = 'High'
+    FROM {source_table(conn, "cyber_incidents", include_archive, ["status", "severity_key"])}
+    WHERE severity_key = 'high'
     GROUP BY status
     ORDER BY count DESC
     """
@@ -174,14 +269,17 @@ def get_high_severity_by_status(conn):
     #Return dataframe
     return df
 
-def get_incident_types_with_many_cases(conn, min_count=5):
+@hot_query({}, {"include_archive": True})
+@cached("cyber_incidents")
+def get_incident_types_with_many_cases(conn, min_count=5, include_archive=False):
     """
     Find incident types with more than min_count cases.
+    Pass include_archive=True to also count archived incidents.
     Uses: SELECT, FROM, GROUP BY, HAVING, ORDER BY
     """
-    query = """
+    query = f"""
     SELECT incident_type, COUNT(*) as count
-    FROM cyber_incidents
+    FROM {source_table(conn, "cyber_incidents", include_archive, ["incident_type"])}
     GROUP BY incident_type
     HAVING COUNT(*) > ?
     ORDER BY count DESC
@@ -191,38 +289,113 @@ def get_incident_types_with_many_cases(conn, min_count=5):
     #Return dataframe
     return df
 
-def get_open_incidents(conn):
+@hot_query()
+def get_open_incidents(conn, columns=None):
     """
     Retrieve all incidents that are currently open.
     Uses: SELECT, FROM, WHERE, ORDER BY
+
+    Only closed and resolved incidents are archived, so the main table holds every open one.
+
+    Args:
+        conn: Database connection
+        columns: Columns to read (None for every column)
     """
-    query = """
-    SELECT *
+    query = f"""
+    SELECT {select_list("cyber_incidents", columns)}
     FROM cyber_incidents
-    WHERE LOWER(status) = 'open'
+    WHERE status_key = 'open'
     ORDER BY date DESC
     """
-    #Create dataframe
-    df = pd.read_sql_query(query, conn)
+    #Create typed dataframe
+    df = read_frame(conn, query)
     #Return dataframe
     return df
 
-def get_high_or_critical_incidents(conn):
+@hot_query({}, {"include_archive": True})
+def get_high_or_critical_incidents(conn, columns=None, include_archive=False):
     """
     Retrieve incidents with High or Critical severity.
     Uses: SELECT, FROM, WHERE, ORDER BY
+
+    Args:
+        conn: Database connection
+        columns: Columns to read (None for every column)
+        include_archive: Also return archived incidents
     """
-    query = """
-    SELECT *
-    FROM cyber_incidents
-    WHERE LOWER(severity) IN ('high', 'critical')
-    ORDER BY date DESC
+    #'+' stops SQLite from walking the date index over every row instead of using the severity/priority index
+    query = f"""
+    SELECT {select_list("cyber_incidents", columns)}
+    FROM {source_table(conn, "cyber_incidents", include_archive)}
+    WHERE severity_key IN ('high', 'critical')
+    ORDER BY +date DESC
     """
-    #Create dataframe
-    df = pd.read_sql_query(query, conn)
+    #Create typed dataframe
+    df = read_frame(conn, query)
     #Return dataframe
     return df
 
+@hot_query({}, {"include_archive": True})
+@cached("cyber_incidents")
+def get_incident_facets(conn, bucket="day", start=None, end=None, include_archive=False):
+    """
+    Count incidents by type, status and severity in one query, plus the time series.
+
+    Args:
+        conn: Database connection
+        bucket: Time bucket of incidents_over_time ("hour", "day", "week" or "month")
+        start: Start of the incidents_over_time date range (optional)
+        end: End of the incidents_over_time date range (optional)
+        include_archive: Also count archived incidents
+
+    Returns:
+        dict: incidents_over_time, incidents_by_type, incidents_by_status
+              and incidents_by_severity DataFrames
+    """
+    #One UNION ALL statement, each part answered from its column's index
+    facets = read_facets(conn, "cyber_incidents", {
+        "incidents_by_type": "incident_type",
+        "incidents_by_status": "status",
+        "incidents_by_severity": "severity",
+    }, include_archive)
+
+    #Time series bucketed in SQL on the epoch timestamp index
+    facets["incidents_over_time"] = get_incident_series(conn, bucket, start, end, include_archive)
+    return facets
+
+@hot_query({}, {"include_archive": True})
+@cached("cyber_incidents")
+def get_incident_counts(conn, include_archive=False):
+    """
+    Count all, open and High/Critical severity incidents from the trigger-maintained counters.
+
+    Args:
+        conn: Database connection
+        include_archive: Also count archived incidents
+
+    Returns:
+        dict: total, open and high_critical counts
+    """
+    return get_domain_counts(conn, "cyber_incidents", include_archive)
+
+@hot_query({"text": "phishing email"})
+def search_incidents(conn, text, limit=SEARCH_LIMIT, columns=None):
+    """
+    Full-text search of incidents by description, best match first.
+
+    Only the main table is indexed, so archived incidents are not searched.
+
+    Args:
+        conn: Database connection
+        text: Words to search for (the last word also matches as a prefix)
+        limit: Maximum number of incidents returned
+        columns: Columns to read (None for every column)
+
+    Returns:
+        pd.DataFrame: Matching incidents with a highlighted snippet and bm25 rank
+    """
+    return search_table(conn, "cyber_incidents", text, limit, columns)
+
 def testing_functions():
     """Helper to print sample analytical outputs when run as a script."""
     conn = connect_database()
@@ -0,0 +1,279 @@
+import csv
+import hashlib
+import os
+import time
+
+import pandas as pd
+
+from app.data.db import CSV_CHUNK_SIZE, atomic, insert_frame, prepare_csv_frame
+
+#Bytes read at a time while hashing a source file
+HASH_BLOCK_SIZE = 1024 * 1024
+
+def hash_file(csv_path, prefix_size=0):
+    """
+    Hash a file in one pass.
+
+    Args:
+        csv_path: Path to the file
+        prefix_size: Also return the hash of the first prefix_size bytes
+
+    Returns:
+        tuple: (hash of whole file, hash of prefix or None)
+    """
+    digest = hashlib.sha256()
+    prefix_hash = None
+    read_bytes = 0
+
+    with open(csv_path, "rb") as f:
+        while True:
+            block = f.read(HASH_BLOCK_SIZE)
+            if not block:
+                break
+
+            #Snapshot the digest exactly at the prefix boundary
+            if prefix_size and prefix_hash is None and read_bytes + len(block) >= prefix_size:
+                cut = prefix_size - read_bytes
+                digest.update(block[:cut])
+                prefix_hash = digest.hexdigest()
+                digest.update(block[cut:])
+            else:
+                digest.update(block)
+
+            read_bytes += len(block)
+
+    return digest.hexdigest(), prefix_hash
+
+def get_manifest_entry(conn, csv_path):
+    """Return the manifest row of a source file as a dict, or None if never loaded."""
+    row = conn.execute("""
+        SELECT file_size, file_mtime_ns, content_hash, rows_loaded
+        FROM ingest_manifest
+        WHERE source_path = ?
+        """, (str(csv_path),)).fetchone()
+
+    if row is None:
+        return None
+
+    return {"file_size": row[0], "file_mtime_ns": row[1], "content_hash": row[2], "rows_loaded": row[3]}
+
+def save_manifest_entry(conn, csv_path, table_name, file_size, mtime_ns, content_hash, rows_loaded):
+    """Record (or replace) the manifest row of a source file. The caller commits."""
+    conn.execute("""
+        INSERT INTO ingest_manifest
+        (source_path, table_name, file_size, file_mtime_ns, content_hash, rows_loaded, loaded_at)
+        VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT(source_path) DO UPDATE SET
+            table_name = excluded.table_name,
+            file_size = excluded.file_size,
+            file_mtime_ns = excluded.file_mtime_ns,
+            content_hash = excluded.content_hash,
+            rows_loaded = excluded.rows_loaded,
+            loaded_at = excluded.loaded_at
+        """, (str(csv_path), table_name, file_size, mtime_ns, content_hash, rows_loaded))
+
+def _ends_with_newline(csv_path, offset):
+    """Check that offset falls right after a line break."""
+    with open(csv_path, "rb") as f:
+        f.seek(offset - 1)
+        return f.read(1) == b"\n"
+
+def read_record(f):
+    """
+    Read one CSV record from a binary file, following quoted fields across line breaks.
+
+    Args:
+        f: File opened in binary mode, positioned at the start of a record
+
+    Returns:
+        bytes: The record including its line break (empty at end of file)
+    """
+    record = f.readline()
+
+    #An odd number of quotes means a quoted field continues on the next line
+    while record.count(b'"') % 2:
+        line = f.readline()
+        if not line:
+            break
+        record += line
+
+    return record
+
+def read_header(f):
+    """
+    Read the column names from the header record of a CSV file.
+
+    Quoted names are unquoted and a UTF-8 byte order mark is dropped.
+
+    Args:
+        f: File opened in binary mode, positioned at the start of the file
+
+    Returns:
+        list[str]: Column names (the file is left at the first data row)
+    """
+    record = read_record(f).decode("utf-8-sig")
+    return next(csv.reader([record]), [])
+
+def read_csv_chunks(csv_path, start_offset=0, chunksize=CSV_CHUNK_SIZE):
+    """
+    Read a CSV file in chunks, optionally starting part-way through it.
+
+    The header line is always taken from the top of the file, so reading
+    from start_offset returns only the rows appended after that byte.
+
+    Args:
+        csv_path: Path to the CSV file
+        start_offset: Byte offset to start from (0 for the whole file)
+        chunksize: Rows per chunk
+
+    Yields:
+        pd.DataFrame: One chunk of raw CSV rows
+    """
+    with open(csv_path, "rb") as f:
+        #Column names from the header line
+        header = read_header(f)
+
+        #Move to the first row that has to be read
+        if start_offset > f.tell():
+            f.seek(start_offset)
+
+        #An empty tail has nothing to parse
+        if f.tell() >= os.fstat(f.fileno()).st_size:
+            return
+
+        yield from pd.read_csv(f, header=None, names=header, chunksize=chunksize)
+
+def plan_ingest(conn, csv_path):
+    """
+    Decide how a source file has to be loaded by comparing it with the manifest.
+
+    Args:
+        conn: Database connection
+        csv_path: Path to the CSV file
+
+    Returns:
+        dict: action ("skip", "touch", "tail" or "full"), start_offset and file details
+    """
+    stat = os.stat(csv_path)
+    entry = get_manifest_entry(conn, csv_path)
+    plan = {"action": "full", "start_offset": 0, "file_size": stat.st_size,
+            "file_mtime_ns": stat.st_mtime_ns, "content_hash": None, "rows_loaded": 0}
+
+    #Same size and modification time: unchanged, no need to read the file
+    if entry and entry["file_size"] == stat.st_size and entry["file_mtime_ns"] == stat.st_mtime_ns:
+        plan.update(action="skip", content_hash=entry["content_hash"], rows_loaded=entry["rows_loaded"])
+        return plan
+
+    #Hash the file, and the part that was loaded last time if the file grew
+    grew = entry is not None and stat.st_size > entry["file_size"]
+    content_hash, prefix_hash = hash_file(csv_path, entry["file_size"] if grew else 0)
+    plan["content_hash"] = content_hash
+
+    #File was touched but its content is the same
+    if entry and content_hash == entry["content_hash"]:
+        plan.update(action="touch", rows_loaded=entry["rows_loaded"])
+        return plan
+
+    #Old content is an unchanged prefix: only the appended tail is new
+    if grew and prefix_hash == entry["content_hash"] and _ends_with_newline(csv_path, entry["file_size"]):
+        plan.update(action="tail", start_offset=entry["file_size"], rows_loaded=entry["rows_loaded"])
+
+    return plan
+
+def ingest_csv(conn, csv_path, table_name, chunksize=CSV_CHUNK_SIZE):
+    """
+    Load a CSV source idempotently using the ingestion manifest.
+
+    Unchanged files are skipped, append-only growth loads only the new tail
+    and any other change re-reads the file. Rows are upserted by id so a
+    restart never duplicates data. Data and manifest are saved in one
+    transaction. Inside a transaction the caller already opened, a failed
+    load undoes only its own writes and the caller decides when to commit.
+
+    Args:
+        conn: Database connection
+        csv_path: Path to the CSV file
+        table_name: Destination table
+        chunksize: Rows per chunk
+
+    Returns:
+        dict: action taken, rows written and seconds spent
+    """
+    #Checks if CSV file exists
+    if not os.path.exists(csv_path):
+        #Print error message
+        print(f"Error: No CSV file was found at {csv_path}")
+        return {"action": "missing", "rows": 0, "seconds": 0.0}
+
+    start = time.perf_counter()
+    plan = plan_ingest(conn, csv_path)
+
+    #Same content with a new modification time: remember it so the next run skips hashing
+    if plan["action"] == "touch":
+        with atomic(conn, "ingest_csv"):
+            save_manifest_entry(conn, csv_path, table_name, plan["file_size"],
+                                 plan["file_mtime_ns"], plan["content_hash"], plan["rows_loaded"])
+
+    #Nothing changed since the last run
+    if plan["action"] in ("skip", "touch"):
+        print(f"Skipped {csv_path}: unchanged since last load")
+        return {"action": "skip", "rows": 0, "seconds": time.perf_counter() - start}
+
+    rows_count = 0
+    cursor = conn.cursor()
+
+    try:
+        #One transaction for data and manifest (a savepoint inside the caller's transaction)
+        with atomic(conn, "ingest_csv"):
+            #Upsert each chunk so rows already in the table are updated, not duplicated
+            for chunk in read_csv_chunks(csv_path, plan["start_offset"], chunksize):
+                chunk = prepare_csv_frame(chunk, table_name)
+                rows_count += insert_frame(cursor, table_name, chunk, upsert=True)
+
+            #Tail loads add to the rows of earlier loads
+            total_rows = plan["rows_loaded"] + rows_count if plan["action"] == "tail" else rows_count
+            save_manifest_entry(conn, csv_path, table_name, plan["file_size"],
+                                 plan["file_mtime_ns"], plan["content_hash"], total_rows)
+    except Exception as e:
+        #The partial load was undone; the caller's own writes are untouched
+        #Print error message
+        print(e)
+        return {"action": "failed", "rows": 0, "seconds": time.perf_counter() - start}
+
+    seconds = time.perf_counter() - start
+    #Print success message
+    print(f"{rows_count} rows upserted from {csv_path} to {table_name} ({plan['action']} load, {seconds:.2f}s)")
+
+    return {"action": plan["action"], "rows": rows_count, "seconds": seconds}
+
+def testing_functions():
+    """Helper to check that a failed load inside a caller's transaction keeps the caller's writes."""
+    import tempfile
+    from app.data.db import get_connection, transaction
+    from app.data.incidents import insert_incident
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        #Second row has no valid id, so the load fails part-way
+        csv_path = os.path.join(tmp_dir, "broken_incidents.csv")
+        with open(csv_path, "w", encoding="utf-8") as f:
+            f.write("incident_id,timestamp,severity,category,status,description\n"
+                    "990001,2024-01-01 10:00:00,High,Phishing,Open,loaded\n"
+                    "not-an-id,2024-01-01 10:00:00,High,Phishing,Open,broken\n")
+
+        with transaction() as tx:
+            incident_id = insert_incident("2024-01-01", "Test", "Low", "Open", "caller write", conn=tx)
+            result = ingest_csv(tx, csv_path, "cyber_incidents", chunksize=1)
+            assert result["action"] == "failed" and tx.in_transaction
+
+        with get_connection() as conn:
+            #Caller's insert was committed, no row of the failed load was
+            assert conn.execute("SELECT COUNT(*) FROM cyber_incidents WHERE id = ?", (incident_id,)).fetchone()[0] == 1
+            assert conn.execute("SELECT COUNT(*) FROM cyber_incidents WHERE id = 990001").fetchone()[0] == 0
+            assert get_manifest_entry(conn, csv_path) is None
+            conn.execute("DELETE FROM cyber_incidents WHERE id = ?", (incident_id,))
+
+    print("\n Failed load inside transaction() kept the caller's write and undid its own rows")
+
+#Ensures that 'testing_functions' runs only when file is executed directly
+if __name__ == "__main__":
+    testing_functions()
@@ -0,0 +1,271 @@
+import os
+import sqlite3
+import threading
+import time
+
+from app.data.db import DB_PATH, get_connection
+
+#Seconds between two passes of the background scheduler
+MAINTENANCE_INTERVAL = 3600
+
+#Free pages (left by deleted rows) as a share of the file before they are given back
+FREE_PAGE_RATIO = 0.10
+
+#Size of the write-ahead log before it is checkpointed and truncated
+WAL_SIZE_LIMIT_MB = 64
+
+#Rows sampled per index by ANALYZE, which keeps it fast on large tables
+ANALYSIS_LIMIT = 1000
+
+#Free pages released per incremental_vacuum call (0 releases all of them)
+VACUUM_PAGES = 0
+
+def attached_schemas(conn):
+    """
+    Return the database files used by a connection (main and the archive when attached).
+
+    Returns:
+        dict: schema name -> path of its file
+    """
+    return {name: path for _, name, path in conn.execute("PRAGMA database_list").fetchall()
+            if name != "temp" and path}
+
+def file_size(path):
+    """Return the size in bytes of a file, or 0 if it does not exist."""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+def database_stats(conn, schema="main"):
+    """
+    Read the page and file sizes of one database of a connection.
+
+    Args:
+        conn: Database connection
+        schema: Schema name (main or archive)
+
+    Returns:
+        dict: page counts, free page ratio, database and WAL file sizes in bytes
+    """
+    page_size = conn.execute(f"PRAGMA {schema}.page_size").fetchone()[0]
+    page_count = conn.execute(f"PRAGMA {schema}.page_count").fetchone()[0]
+    free_pages = conn.execute(f"PRAGMA {schema}.freelist_count").fetchone()[0]
+    path = attached_schemas(conn).get(schema, "")
+
+    return {
+        "page_size": page_size,
+        "page_count": page_count,
+        "free_pages": free_pages,
+        "free_ratio": free_pages / page_count if page_count else 0.0,
+        "auto_vacuum": conn.execute(f"PRAGMA {schema}.auto_vacuum").fetchone()[0],
+        "file_bytes": file_size(path),
+        "wal_bytes": file_size(f"{path}-wal"),
+    }
+
+def run_optimize(conn, schema="main"):
+    """
+    Refresh the query planner statistics of a database.
+
+    ANALYZE samples at most ANALYSIS_LIMIT rows per index, so it takes
+    milliseconds even on large tables and can run on every pass. (PRAGMA
+    optimize would skip tables the maintenance connection never queried.)
+
+    Args:
+        conn: Database connection
+        schema: Schema name (main or archive)
+    """
+    #Bound the number of rows ANALYZE reads per index
+    conn.execute(f"PRAGMA analysis_limit = {int(ANALYSIS_LIMIT)}")
+    conn.execute(f"ANALYZE {schema}")
+    conn.commit()
+
+def enable_incremental_vacuum(conn, schema="main"):
+    """
+    Switch a database to incremental auto-vacuum.
+
+    Databases created without it keep their free pages for ever, so the
+    setting is changed and the file rebuilt once with VACUUM. This needs
+    a moment with no other writers and may take a while on a large file.
+
+    Args:
+        conn: Database connection (not inside a transaction)
+        schema: Schema name (main or archive)
+
+    Returns:
+        bool: True if the database was converted, False if it already was
+    """
+    #0 = NONE, 1 = FULL, 2 = INCREMENTAL
+    if conn.execute(f"PRAGMA {schema}.auto_vacuum").fetchone()[0] == 2:
+        return False
+
+    conn.execute(f"PRAGMA {schema}.auto_vacuum = INCREMENTAL")
+    conn.execute(f"VACUUM {schema}")
+    return True
+
+def run_incremental_vacuum(conn, schema="main", pages=VACUUM_PAGES):
+    """
+    Give the free pages of a database back to the file system.
+
+    Args:
+        conn: Database connection (not inside a transaction)
+        schema: Schema name (main or archive)
+        pages: Maximum number of pages to release (0 for all)
+
+    Returns:
+        int: Number of free pages released
+    """
+    before = conn.execute(f"PRAGMA {schema}.freelist_count").fetchone()[0]
+
+    #execute() steps a pragma without result columns only once (one page),
+    #executescript() runs it to completion
+    conn.executescript(f"PRAGMA {schema}.incremental_vacuum({int(pages)});")
+
+    return before - conn.execute(f"PRAGMA {schema}.freelist_count").fetchone()[0]
+
+def run_checkpoint(conn, schema="main", mode="TRUNCATE"):
+    """
+    Copy the write-ahead log back into a database and shrink the log file.
+
+    Args:
+        conn: Database connection
+        schema: Schema name (main or archive)
+        mode: PASSIVE, FULL, RESTART or TRUNCATE
+
+    Returns:
+        tuple: (busy, log frames, checkpointed frames). busy is 1 when a
+               reader or writer stopped the checkpoint from finishing.
+    """
+    return tuple(conn.execute(f"PRAGMA {schema}.wal_checkpoint({mode})").fetchone())
+
+def format_size(size):
+    """Return a byte count as megabytes for the maintenance log."""
+    return f"{size / 1048576:.1f} MB"
+
+def maintain_schema(conn, schema, force=False):
+    """
+    Run the maintenance tasks due on one database of a connection.
+
+    Args:
+        conn: Database connection (not inside a transaction)
+        schema: Schema name (main or archive)
+        force: Run every task regardless of the thresholds
+
+    Returns:
+        dict: Seconds taken by each task that ran, plus stats before and after
+    """
+    before = database_stats(conn, schema)
+    timings = {}
+
+    #Planner statistics
+    start = time.perf_counter()
+    run_optimize(conn, schema)
+    timings["ANALYZE"] = time.perf_counter() - start
+
+    #Free pages left by deleted or archived rows
+    if force or before["free_ratio"] >= FREE_PAGE_RATIO:
+        start = time.perf_counter()
+        if enable_incremental_vacuum(conn, schema):
+            timings["VACUUM"] = time.perf_counter() - start
+        else:
+            run_incremental_vacuum(conn, schema)
+            timings["incremental_vacuum"] = time.perf_counter() - start
+
+    #Write-ahead log that readers kept from being reset
+    if force or before["wal_bytes"] >= WAL_SIZE_LIMIT_MB * 1048576:
+        start = time.perf_counter()
+        busy, _, _ = run_checkpoint(conn, schema)
+        timings["wal_checkpoint" + (" (busy)" if busy else "")] = time.perf_counter() - start
+
+    after = database_stats(conn, schema)
+    tasks = ", ".join(f"{task} {seconds:.2f}s" for task, seconds in timings.items())
+    print(f"Maintenance of {schema}: {tasks}")
+    print(f"  file {format_size(before['file_bytes'])} -> {format_size(after['file_bytes'])}, "
+          f"WAL {format_size(before['wal_bytes'])} -> {format_size(after['wal_bytes'])}, "
+          f"free pages {before['free_pages']} -> {after['free_pages']}")
+
+    return {"before": before, "after": after, "timings": timings}
+
+def run_maintenance(db_path=DB_PATH, force=False):
+    """
+    Run one maintenance pass over the database and its archive.
+
+    Statistics are refreshed on every pass. Free pages are released when
+    they exceed FREE_PAGE_RATIO of the file and the WAL is checkpointed
+    when it grows past WAL_SIZE_LIMIT_MB, unless force is set.
+
+    Args:
+        db_path: Path to the database file
+        force: Run every task regardless of the thresholds
+
+    Returns:
+        dict: schema -> report of maintain_schema
+    """
+    start = time.perf_counter()
+    reports = {}
+
+    with get_connection(db_path) as conn:
+        for schema in attached_schemas(conn):
+            try:
+                reports[schema] = maintain_schema(conn, schema, force)
+            except sqlite3.OperationalError as error:
+                #A busy database is left for the next pass
+                print(f"Maintenance of {schema} skipped: {error}")
+
+    print(f"Maintenance finished in {time.perf_counter() - start:.2f}s")
+    return reports
+
+_scheduler = None
+_scheduler_stop = threading.Event()
+_scheduler_lock = threading.Lock()
+
+def _maintenance_loop(db_path, interval):
+    """Run maintenance every interval seconds until stopped (runs on the scheduler thread)."""
+    while not _scheduler_stop.wait(interval):
+        #Any failure is logged and retried next pass, so the thread never dies silently
+        try:
+            run_maintenance(db_path)
+        except Exception as error:
+            print(f"Maintenance failed: {type(error).__name__}: {error}")
+
+def start_maintenance_scheduler(interval=MAINTENANCE_INTERVAL, db_path=DB_PATH):
+    """
+    Start the background maintenance thread (does nothing if it is already running).
+
+    get_pool calls it when the app database's first pool is created, so
+    the app and scripts using the database keep it maintained. The thread
+    waits one interval before its first pass.
+
+    Args:
+        interval: Seconds between two maintenance passes
+        db_path: Path to the database file
+
+    Returns:
+        threading.Thread: Scheduler thread
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None or not _scheduler.is_alive():
+            _scheduler_stop.clear()
+            #Daemon thread so it never keeps the process alive on exit
+            _scheduler = threading.Thread(target=_maintenance_loop, args=(db_path, interval),
+                                          name="maintenance", daemon=True)
+            _scheduler.start()
+        return _scheduler
+
+def stop_maintenance_scheduler():
+    """Stop the background maintenance thread and wait for a running pass to finish."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is not None:
+            _scheduler_stop.set()
+            _scheduler.join()
+            _scheduler = None
+
+def testing_functions():
+    """Helper to run a full maintenance pass when executed directly."""
+    run_maintenance(force=True)
+
+#Ensures that 'testing_functions' runs only when file is executed directly
+if __name__ == "__main__":
+    testing_functions()
@@ -0,0 +1,61 @@
+from app.data.frames import read_frame, select_list
+
+#Rows shown per page by default
+PAGE_SIZE = 50
+
+def read_page(conn, table, page_size=PAGE_SIZE, cursor=None, filters=None, filter_columns=(), columns=None,
+              source=None):
+    """
+    Read one page of a table, newest id first, using keyset pagination.
+
+    Instead of OFFSET (which walks every skipped row) the page starts right
+    below the last id already shown, so every page is an index range read.
+
+    Args:
+        conn: Database connection
+        table: Table to read
+        page_size: Rows per page
+        cursor: Last id of the previous page (None for the first page)
+        filters: Dict of column -> value rows must equal (None values are ignored)
+        filter_columns: Columns that may be filtered on
+        columns: Columns to read (None for every column, id is always included)
+        source: Table or view to read from (default: table, e.g. all_<table> for archived rows)
+
+    Returns:
+        tuple: (typed DataFrame of the page, cursor of the next page or None on the last page)
+    """
+    conditions = []
+    params = []
+
+    #Continue below the last id of the previous page
+    if cursor is not None:
+        conditions.append("id < ?")
+        params.append(int(cursor))
+
+    #Equality filters on whitelisted columns only (names are put into the SQL)
+    for column, value in (filters or {}).items():
+        if column not in filter_columns:
+            raise ValueError(f"Cannot filter {table} on '{column}'. Choose from: {', '.join(filter_columns)}")
+        if value is not None:
+            conditions.append(f"{column} = ?")
+            params.append(value)
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    #Read one extra row to know whether another page follows
+    query = f"SELECT {select_list(table, columns)} FROM {source or table} {where} ORDER BY id DESC LIMIT ?"
+    df = read_frame(conn, query, (*params, page_size + 1))
+
+    #Next page starts below the last row shown
+    next_cursor = None
+    if len(df) > page_size:
+        df = df.iloc[:page_size]
+        next_cursor = int(df["id"].iloc[-1])
+
+    return df, next_cursor
+
+def get_id_range(conn, table):
+    """Return (smallest id, largest id) of a table, or (None, None) when it is empty."""
+    #Separate subqueries so each is answered from one end of the table b-tree
+    #(a single SELECT MIN(id), MAX(id) would scan every row)
+    return tuple(conn.execute(f"SELECT (SELECT MIN(id) FROM {table}), (SELECT MAX(id) FROM {table})").fetchone())
@@ -0,0 +1,198 @@
+import io
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import pandas as pd
+
+from app.data.db import atomic, frame_to_rows, insert_rows, prepare_csv_frame
+from app.data.ingest import plan_ingest, read_header, save_manifest_entry
+
+#Bytes of CSV parsed by one worker task
+SEGMENT_BYTES = 16 * 1024 * 1024
+
+def split_segments(csv_path, start_offset, end_offset, segment_bytes=SEGMENT_BYTES):
+    """
+    Split a byte range of a CSV file into segments that start and end on record boundaries.
+
+    Quotes are counted while reading, so a line break inside a quoted
+    field (e.g. a multi-line description) never ends a segment.
+
+    Args:
+        csv_path: Path to the CSV file
+        start_offset: First byte to read (start of a record)
+        end_offset: Byte after the last one to read
+        segment_bytes: Target size of each segment
+
+    Returns:
+        list[tuple]: (start, end) byte offsets
+    """
+    segments = []
+
+    with open(csv_path, "rb") as f:
+        f.seek(start_offset)
+        start = start_offset
+        while start < end_offset:
+            #Read ahead, then finish the current line so no row is cut in half
+            data = f.read(min(segment_bytes, end_offset - start))
+            if f.tell() < end_offset:
+                data += f.readline()
+
+            #An odd number of quotes means the segment stopped inside a quoted field
+            quotes = data.count(b'"')
+            while quotes % 2 and f.tell() < end_offset:
+                line = f.readline()
+                quotes += line.count(b'"')
+
+            end = min(f.tell(), end_offset)
+            segments.append((start, end))
+            start = end
+
+    return segments
+
+def parse_segment(csv_path, table_name, header, start, end):
+    """
+    Parse and transform one segment of a CSV file (runs in a worker process).
+
+    Args:
+        csv_path: Path to the CSV file
+        table_name: Destination table
+        header: Column names from the header line
+        start: First byte of the segment
+        end: Byte after the last one of the segment
+
+    Returns:
+        tuple: (column names, list of row tuples, parse seconds)
+    """
+    parse_start = time.perf_counter()
+
+    #Read only this worker's bytes
+    with open(csv_path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    #Parse raw rows and apply the same renames and defaults as load_csv_to_table
+    df = pd.read_csv(io.BytesIO(data), header=None, names=header)
+    df = prepare_csv_frame(df, table_name)
+
+    return list(df.columns), frame_to_rows(df), time.perf_counter() - parse_start
+
+def _read_header(csv_path):
+    """Return column names and the offset of the first data row."""
+    with open(csv_path, "rb") as f:
+        header = read_header(f)
+        return header, f.tell()
+
+def run_bootstrap(conn, sources, workers=None, segment_bytes=SEGMENT_BYTES):
+    """
+    Load several CSV sources, parsing in a process pool and writing from one connection.
+
+    Worker processes read and transform segments of every changed source
+    in parallel while this process is the single SQLite writer. Rows are
+    upserted by id and manifests saved in the same transaction, so the
+    pipeline is as idempotent as ingest_csv. Inside a transaction the
+    caller already opened, the caller decides when to commit.
+
+    Args:
+        conn: Database connection used as the single writer
+        sources: List of (csv_path, table_name)
+        workers: Number of worker processes (default: CPU count)
+        segment_bytes: Target size of each parse task
+
+    Returns:
+        dict: Per-source results and total seconds
+    """
+    run_start = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    results = {}
+    tasks = []
+
+    #Plan every source against the manifest
+    for csv_path, table_name in sources:
+        #Checks if CSV file exists
+        if not os.path.exists(csv_path):
+            print(f"Error: No CSV file was found at {csv_path}")
+            results[str(csv_path)] = {"table": table_name, "action": "missing", "rows": 0}
+            continue
+
+        plan = plan_ingest(conn, csv_path)
+        results[str(csv_path)] = {"table": table_name, "action": plan["action"], "rows": 0,
+                                  "segments": 0, "done": 0, "parse_seconds": 0.0,
+                                  "write_seconds": 0.0, "plan": plan}
+
+        if plan["action"] in ("skip", "touch"):
+            continue
+
+        #Split the part of the file that has to be read into parse tasks
+        header, data_offset = _read_header(csv_path)
+        start = max(plan["start_offset"], data_offset)
+        segments = split_segments(csv_path, start, plan["file_size"], segment_bytes)
+        results[str(csv_path)]["segments"] = len(segments)
+        for segment_start, segment_end in segments:
+            tasks.append((csv_path, table_name, header, segment_start, segment_end))
+
+    def write(task, columns, rows, parse_seconds):
+        #Single writer: only this process touches SQLite
+        result = results[str(task[0])]
+        write_start = time.perf_counter()
+        result["rows"] += insert_rows(cursor, task[1], columns, rows, upsert=True)
+        result["write_seconds"] += time.perf_counter() - write_start
+        result["parse_seconds"] += parse_seconds
+        result["done"] += 1
+
+        #Progress report
+        print(f"[{result['table']}] segment {result['done']}/{result['segments']} "
+              f"- {result['rows']} rows - {time.perf_counter() - run_start:.2f}s elapsed")
+
+    cursor = conn.cursor()
+
+    #One transaction for every source and manifest (a savepoint inside the caller's
+    #transaction), saved when all sources are written and undone if any fails
+    with atomic(conn, "bootstrap"):
+        if len(tasks) <= 1 or workers == 1:
+            #Not worth starting processes for a single task
+            for task in tasks:
+                write(task, *parse_segment(*task))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                pending = {}
+                queued = iter(tasks)
+
+                #Keep a bounded number of parsed segments in flight to cap memory
+                for task in queued:
+                    pending[executor.submit(parse_segment, *task)] = task
+                    if len(pending) >= workers * 2:
+                        break
+
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        task = pending.pop(future)
+                        write(task, *future.result())
+
+                        #Refill the queue with the next task
+                        next_task = next(queued, None)
+                        if next_task is not None:
+                            pending[executor.submit(parse_segment, *next_task)] = next_task
+
+        #Record what was loaded (touched files only need their new mtime)
+        for csv_path, table_name in sources:
+            result = results[str(csv_path)]
+            plan = result.get("plan")
+            if plan is None or plan["action"] == "skip":
+                continue
+            total_rows = plan["rows_loaded"] + result["rows"] if plan["action"] in ("tail", "touch") else result["rows"]
+            save_manifest_entry(conn, csv_path, table_name, plan["file_size"],
+                                plan["file_mtime_ns"], plan["content_hash"], total_rows)
+
+    total_seconds = time.perf_counter() - run_start
+
+    #Timing summary
+    print(f"{'Source':<40} {'Action':<7} {'Rows':>9} {'Parse s':>8} {'Write s':>8}")
+    for path, result in results.items():
+        result.pop("plan", None)
+        print(f"{path:<40} {result['action']:<7} {result['rows']:>9} "
+              f"{result.get('parse_seconds', 0.0):>8.2f} {result.get('write_seconds', 0.0):>8.2f}")
+    print(f"Bootstrap finished in {total_seconds:.2f}s")
+
+    return {"sources": results, "seconds": total_seconds}
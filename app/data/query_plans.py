@@ -0,0 +1,125 @@
+import re
+import sys
+
+from app.data.cache import clear_cache
+from app.data.db import get_connection
+from app.data.registry import HOT_QUERIES
+from app.data import datasets, incidents, tickets
+
+#Hot read functions are registered with @hot_query in the data modules
+#(importing the modules above fills HOT_QUERIES), each with the arguments to check
+
+#A plan step that visits every row of a table (directly or through a
+#non-covering index). Scans of a covering index only read the narrow index.
+FULL_SCAN = re.compile(r"^SCAN (?:\w+\.)?(\w+)\b(?! USING COVERING INDEX)(?! VIRTUAL TABLE INDEX \d+:\S)"
+                       r"(?: USING INDEX (\w+))?")
+
+#Keyset page: rows read in id order and stopped by LIMIT, with no sort
+BOUNDED_SCAN = re.compile(r"\bORDER BY id DESC LIMIT \d+\s*$", re.IGNORECASE)
+
+def table_names(conn):
+    """Return the names of the tables of every attached database (views and SQLite's own tables excluded)."""
+    names = set()
+    for _, schema, _ in conn.execute("PRAGMA database_list").fetchall():
+        names.update(row[0] for row in conn.execute(
+            f"SELECT name FROM {schema}.sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"))
+    return names
+
+def partial_index_names(conn):
+    """Return the names of the partial indexes (CREATE INDEX ... WHERE) of every attached database."""
+    names = set()
+    for _, schema, _ in conn.execute("PRAGMA database_list").fetchall():
+        names.update(row[0] for row in conn.execute(
+            f"SELECT name FROM {schema}.sqlite_master WHERE type = 'index' AND sql LIKE '% WHERE %'"))
+    return names
+
+def full_scans(conn, sql, tables, partial_indexes=()):
+    """
+    Return the plan steps of a statement that read a whole table.
+
+    Scans of views and subqueries (their inner steps are checked on their
+    own), full-text MATCH lookups, scans of a partial index (which only
+    holds the rows the query wants) and keyset pages that stop at their
+    LIMIT without sorting are not full scans.
+
+    Args:
+        conn: Database connection
+        sql: Statement to explain
+        tables: Names of real tables (see table_names)
+        partial_indexes: Names of partial indexes (see partial_index_names)
+
+    Returns:
+        list[str]: Plan steps
+    """
+    plan = explain(conn, sql)
+    if BOUNDED_SCAN.search(sql) and not any("TEMP B-TREE" in detail for detail in plan):
+        return []
+
+    return [detail for detail in plan
+            if (match := FULL_SCAN.match(detail.strip())) and match.group(1) in tables
+            and match.group(2) not in partial_indexes]
+
+def capture_queries(conn, func, kwargs=None):
+    """Run a query function and return the SQL statements it executed."""
+    statements = []
+
+    #Cached results would hide the statements of the function
+    clear_cache()
+
+    #Record every statement with its parameters filled in
+    conn.set_trace_callback(statements.append)
+    try:
+        func(conn, **(kwargs or {}))
+    finally:
+        conn.set_trace_callback(None)
+
+    return [sql for sql in statements if sql.lstrip().upper().startswith(("SELECT", "WITH"))]
+
+def explain(conn, sql):
+    """Return the detail lines of EXPLAIN QUERY PLAN for a statement."""
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()]
+
+def check_query_plans(conn, queries=HOT_QUERIES):
+    """
+    Explain every query run by the hot query functions.
+
+    Args:
+        conn: Database connection
+        queries: (label, function, keyword arguments) of the functions to check
+
+    Returns:
+        list[tuple]: (label, plan step) for every full table scan found
+    """
+    failures = []
+    tables = table_names(conn)
+    partial_indexes = partial_index_names(conn)
+
+    for label, func, kwargs in queries:
+        for sql in capture_queries(conn, func, kwargs):
+            failures.extend((label, detail) for detail in full_scans(conn, sql, tables, partial_indexes))
+
+    return failures
+
+def testing_functions():
+    """Print query plans and exit with an error if a hot query scans a table."""
+    #Pooled connection, so the archive is attached and the union views exist
+    with get_connection() as conn:
+        for label, func, kwargs in HOT_QUERIES:
+            print(f"\n {label}:")
+            for sql in capture_queries(conn, func, kwargs):
+                for detail in explain(conn, sql):
+                    print(f"   {detail}")
+
+        failures = check_query_plans(conn)
+
+    if failures:
+        print("\n Hot queries falling back to a full table scan:")
+        for name, detail in failures:
+            print(f"   {name}: {detail}")
+        sys.exit(1)
+
+    print(f"\n All {len(HOT_QUERIES)} hot queries use an index.")
+
+#Ensures that 'testing_functions' runs only when file is executed directly
+if __name__ == "__main__":
+    testing_functions()
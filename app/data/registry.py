@@ -0,0 +1,22 @@
+#Read functions whose query plans are checked by query_plans, filled in by
+#@hot_query when the data modules are imported: (label, function, keyword arguments)
+HOT_QUERIES = []
+
+def hot_query(*variants):
+    """
+    Register a read function as a hot query so its query plans are checked.
+
+    Args:
+        variants: Dicts of keyword arguments to call the function with, one
+                  check each (none: one call with the connection only)
+
+    Returns:
+        Decorator returning the function unchanged
+    """
+    def decorator(func):
+        for kwargs in variants or ({},):
+            arguments = ", ".join(f"{name}={value!r}" for name, value in kwargs.items())
+            HOT_QUERIES.append((f"{func.__name__}({arguments})", func, kwargs))
+        return func
+
+    return decorator
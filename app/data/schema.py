@@ -1,3 +1,5 @@
+import re
+
 def create_users_table(conn):
     """Create users table."""
     #Create cursor
@@ -14,17 +16,17 @@ def create_users_table(conn):
         )
     """)
 
+def add_users_domain_column(conn):
+    """Add the domain column to users tables created before it existed."""
+    #Create cursor
+    cursor = conn.cursor()
+
     #Ensure domain column exists for older databases
     cursor.execute("PRAGMA table_info(users)")
     columns = [row[1] for row in cursor.fetchall()]
     if "domain" not in columns:
         cursor.execute("ALTER TABLE users ADD COLUMN domain TEXT")
 
-    #Save changes
-    conn.commit()
-    #Success message
-    print("✅ Users table created successfully!")
-
 def create_cyber_incidents_table(conn):
     """Create cyber_incidents table."""
     #Create cursor
@@ -44,11 +46,6 @@ def create_cyber_incidents_table(conn):
         )
     """)
 
-    #Save changes 
-    conn.commit()
-    #Success message
-    print("✅ cyber_incidents table created successfully!")
-
 def create_datasets_metadata_table(conn):
     """Create datasets_metadata table."""
     #Create cursor
@@ -69,11 +66,6 @@ def create_datasets_metadata_table(conn):
         )
     """)
 
-    #Save changes 
-    conn.commit()
-    #Success message
-    print("✅ datasets_metadata table created successfully!")
-
 def create_it_tickets_table(conn):
     """Create it_tickets table."""
     #Create cursor
@@ -95,14 +87,568 @@ def create_it_tickets_table(conn):
         )
     """)
 
-    #Save changes 
-    conn.commit()
-    #Success message
-    print("✅ it_tickets table created successfully!")
+def create_ingest_manifest_table(conn):
+    """Create ingest_manifest table (one row per loaded CSV source)."""
+    #Create cursor
+    cursor = conn.cursor()
 
-def create_all_tables(conn):
-    """Create all tables."""
+    #SQL statement to create ingest_manifest table
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS ingest_manifest(
+            source_path TEXT PRIMARY KEY,
+            table_name TEXT NOT NULL,
+            file_size INTEGER NOT NULL,
+            file_mtime_ns INTEGER NOT NULL,
+            content_hash TEXT NOT NULL,
+            rows_loaded INTEGER NOT NULL DEFAULT 0,
+            loaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+#Secondary indexes for the analytical queries in app/data (name, table, indexed columns).
+#Each GROUP BY / WHERE column leads an index, and the other columns a query reads are
+#appended so SQLite can answer from the index without touching the table.
+INDEXES = [
+    #cyber_incidents
+    ("idx_incidents_type", "cyber_incidents", "incident_type"),
+    ("idx_incidents_status", "cyber_incidents", "status"),
+    ("idx_incidents_severity_status", "cyber_incidents", "severity, status"),
+    ("idx_incidents_date", "cyber_incidents", "date"),
+    ("idx_incidents_status_lower", "cyber_incidents", "LOWER(status), date"),
+    ("idx_incidents_severity_lower", "cyber_incidents", "LOWER(severity), date"),
+    #it_tickets
+    ("idx_tickets_status", "it_tickets", "status"),
+    ("idx_tickets_priority_assignee", "it_tickets", "priority, assigned_to"),
+    ("idx_tickets_assignee", "it_tickets", "assigned_to"),
+    ("idx_tickets_category", "it_tickets", "category"),
+    ("idx_tickets_created", "it_tickets", "created_date"),
+    ("idx_tickets_status_lower", "it_tickets", "LOWER(status), created_date"),
+    ("idx_tickets_priority_lower", "it_tickets", "LOWER(priority), created_date"),
+    #datasets_metadata
+    ("idx_datasets_category", "datasets_metadata", "category"),
+    ("idx_datasets_source", "datasets_metadata", "source"),
+    ("idx_datasets_last_updated", "datasets_metadata", "last_updated"),
+    ("idx_datasets_record_count", "datasets_metadata", "record_count, source, dataset_name"),
+    ("idx_datasets_column_count", "datasets_metadata", "column_count, dataset_name"),
+]
+
+def create_indexes(conn):
+    """Create secondary indexes used by the analytical queries."""
+    #Create cursor
+    cursor = conn.cursor()
+
+    #Create each index unless it already exists
+    for name, table, columns in INDEXES:
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table}({columns})")
+
+    #Refresh planner statistics for the new indexes
+    cursor.execute("ANALYZE")
+
+def create_dataset_facets_index(conn):
+    """Create the covering index read by the dataset facet function."""
+    #Create cursor
+    cursor = conn.cursor()
+
+    #Every column the dataset charts need, so one index scan answers them all
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_datasets_facets ON datasets_metadata(
+            category, source, last_updated, dataset_name, record_count, column_count)
+    """)
+
+    #Refresh planner statistics for the new index
+    cursor.execute("ANALYZE datasets_metadata")
+
+#Tables summarised in domain_counts (table, column stored as level).
+#Status and level are stored as lowercase keys, matching the enum key columns of the tables.
+COUNTED_TABLES = [
+    ("cyber_incidents", "severity"),
+    ("it_tickets", "priority"),
+]
+
+def create_domain_counts_table(conn, normalise="LOWER({})"):
+    """
+    Create domain_counts (rows per table x status x level) and the triggers that keep it current.
+
+    Existing rows are counted once here; after that every insert, update
+    and delete adjusts the matching counter in the same transaction.
+
+    Args:
+        conn: Database connection
+        normalise: SQL template turning a status/level column into its stored key
+    """
+    #Stored key of a column, e.g. key("NEW.status")
+    key = normalise.format
+
+    #Create cursor
+    cursor = conn.cursor()
+
+    #SQL statement to create domain_counts table
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS domain_counts(
+            domain TEXT NOT NULL,
+            status TEXT NOT NULL,
+            level TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (domain, status, level)
+        ) WITHOUT ROWID
+    """)
+
+    for table, level in COUNTED_TABLES:
+        #Add one to the counter of a row's status and level
+        increment = f"""
+            INSERT INTO domain_counts (domain, status, level, count)
+            VALUES ('{table}', {key("NEW.status")}, {key(f"NEW.{level}")}, 1)
+            ON CONFLICT(domain, status, level) DO UPDATE SET count = count + 1;
+        """
+        #Take one off the counter of a row's old status and level
+        decrement = f"""
+            UPDATE domain_counts SET count = count - 1
+            WHERE domain = '{table}' AND status = {key("OLD.status")} AND level = {key(f"OLD.{level}")};
+        """
+
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_counts_insert
+            AFTER INSERT ON {table}
+            BEGIN {increment} END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_counts_delete
+            AFTER DELETE ON {table}
+            BEGIN {decrement} END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_counts_update
+            AFTER UPDATE OF status, {level} ON {table}
+            BEGIN {decrement} {increment} END
+        """)
+
+        #Backfill the counters from the rows already stored
+        cursor.execute(f"DELETE FROM domain_counts WHERE domain = '{table}'")
+        cursor.execute(f"""
+            INSERT INTO domain_counts (domain, status, level, count)
+            SELECT '{table}', {key("status")}, {key(level)}, COUNT(*)
+            FROM {table}
+            GROUP BY {key("status")}, {key(level)}
+        """)
+
+#Epoch-second copies of the date text columns (table, text column, integer column).
+#Time series are bucketed on the integer column instead of grouping the raw text.
+TIMESTAMP_COLUMNS = [
+    ("cyber_incidents", "date", "date_ts"),
+    ("it_tickets", "created_date", "created_ts"),
+    ("datasets_metadata", "last_updated", "last_updated_ts"),
+]
+
+def add_timestamp_columns(conn):
+    """
+    Add the indexed epoch timestamp columns listed in TIMESTAMP_COLUMNS.
+
+    Existing rows are backfilled here. Triggers fill the column for rows
+    inserted without it (bulk ingest computes it in pandas) and keep it
+    in step when the date text is updated.
+    """
+    #Create cursor
+    cursor = conn.cursor()
+
+    for table, source, column in TIMESTAMP_COLUMNS:
+        #Add the column unless it already exists
+        cursor.execute(f"PRAGMA table_info({table})")
+        if column not in [row[1] for row in cursor.fetchall()]:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} INTEGER")
+
+        #Text to epoch seconds (NULL when the text is not a valid date)
+        epoch = f"CAST(strftime('%s', NEW.{source}) AS INTEGER)"
+
+        #Backfill rows already stored
+        cursor.execute(f"UPDATE {table} SET {column} = CAST(strftime('%s', {source}) AS INTEGER)")
+
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_{column}_insert
+            AFTER INSERT ON {table}
+            WHEN NEW.{column} IS NULL
+            BEGIN UPDATE {table} SET {column} = {epoch} WHERE id = NEW.id; END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_{column}_update
+            AFTER UPDATE OF {source} ON {table}
+            BEGIN UPDATE {table} SET {column} = {epoch} WHERE id = NEW.id; END
+        """)
+
+        #Range and bucket queries read the timestamp from this index
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table}({column})")
+
+    #Refresh planner statistics for the new indexes
+    cursor.execute("ANALYZE")
+
+#Canonical enum keys stored as virtual generated columns (table, source column, key column).
+#Filters compare the key with a lowercase literal, so the case or padding of the
+#source data never changes the answer and the key's index can serve the lookup.
+ENUM_KEY_COLUMNS = [
+    ("cyber_incidents", "status", "status_key"),
+    ("cyber_incidents", "severity", "severity_key"),
+    ("it_tickets", "status", "status_key"),
+    ("it_tickets", "priority", "priority_key"),
+]
+
+#Indexes on the enum keys, replacing the LOWER() expression indexes
+ENUM_KEY_INDEXES = [
+    ("idx_incidents_status_key", "cyber_incidents", "status_key, date"),
+    ("idx_incidents_severity_key", "cyber_incidents", "severity_key, status"),
+    ("idx_tickets_status_key", "it_tickets", "status_key, created_date"),
+    ("idx_tickets_priority_key", "it_tickets", "priority_key, assigned_to"),
+]
+
+def add_enum_key_columns(conn):
+    """
+    Add the generated enum key columns and their indexes.
+
+    The keys are computed by SQLite on every write, so no insert path has
+    to remember to normalise them. The domain_counts triggers are rebuilt
+    on the same normalisation so counters and filters always agree.
+    """
+    #Create cursor
+    cursor = conn.cursor()
+
+    for table, source, column in ENUM_KEY_COLUMNS:
+        #Add the column unless it already exists (only VIRTUAL columns can be added to a table)
+        cursor.execute(f"PRAGMA table_xinfo({table})")
+        if column not in [row[1] for row in cursor.fetchall()]:
+            cursor.execute(f"""
+                ALTER TABLE {table}
+                ADD COLUMN {column} TEXT GENERATED ALWAYS AS (LOWER(TRIM({source}))) VIRTUAL
+            """)
+
+    #Index the keys and drop the expression indexes they replace
+    for name, table, columns in ENUM_KEY_INDEXES:
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table}({columns})")
+    for name in ("idx_incidents_status_lower", "idx_incidents_severity_lower",
+                 "idx_tickets_status_lower", "idx_tickets_priority_lower"):
+        cursor.execute(f"DROP INDEX IF EXISTS {name}")
+
+    #Rebuild the counters with the same normalisation as the keys
+    for table, _ in COUNTED_TABLES:
+        for event in ("insert", "delete", "update"):
+            cursor.execute(f"DROP TRIGGER IF EXISTS trg_{table}_counts_{event}")
+    create_domain_counts_table(conn, normalise="LOWER(TRIM({}))")
+
+    #Refresh planner statistics for the new indexes
+    cursor.execute("ANALYZE")
+
+#Full-text indexes over free-text columns (table, FTS5 table, indexed columns).
+#External content: the FTS table stores only the index and reads the text back from the table.
+FTS_TABLES = [
+    ("cyber_incidents", "incidents_fts", ["description"]),
+    ("it_tickets", "tickets_fts", ["subject", "description"]),
+]
+
+def create_fts_tables(conn):
+    """
+    Create the FTS5 search indexes listed in FTS_TABLES and the triggers that keep them in sync.
+
+    Existing rows are indexed here with a rebuild. After that every insert,
+    update and delete of the source table updates the index in the same
+    transaction.
+    """
+    #Create cursor
+    cursor = conn.cursor()
+
+    for table, fts, columns in FTS_TABLES:
+        names = ", ".join(columns)
+        new_values = ", ".join(f"NEW.{column}" for column in columns)
+        old_values = ", ".join(f"OLD.{column}" for column in columns)
+
+        #Porter stemming so 'phishing' also matches 'phished'.
+        #Prefix indexes answer 2 and 3 letter prefix queries without expanding every term.
+        cursor.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+                {names}, content='{table}', content_rowid='id',
+                tokenize='porter unicode61 remove_diacritics 2', prefix='2 3')
+        """)
+
+        #Index a new row
+        add = f"INSERT INTO {fts}(rowid, {names}) VALUES (NEW.id, {new_values});"
+        #Remove a row's old text (external content needs the old values)
+        remove = f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', OLD.id, {old_values});"
+
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_fts_insert
+            AFTER INSERT ON {table}
+            BEGIN {add} END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_fts_delete
+            AFTER DELETE ON {table}
+            BEGIN {remove} END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_fts_update
+            AFTER UPDATE OF {names} ON {table}
+            BEGIN {remove} {add} END
+        """)
+
+        #Index the rows already stored
+        cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+#Tables whose closed records move to the archive database, with the epoch column their age is read from
+ARCHIVED_TABLES = [
+    ("cyber_incidents", "date_ts"),
+    ("it_tickets", "created_ts"),
+]
+
+def is_archive_attached(conn):
+    """Tell if the archive database is attached to a connection."""
+    return any(row[1] == "archive" for row in conn.execute("PRAGMA database_list"))
+
+def stored_columns(conn, table, schema="main"):
+    """Return the columns of a table that hold data (generated columns are left out)."""
+    #hidden is 2 or 3 for generated columns
+    return [row[1] for row in conn.execute(f"PRAGMA {schema}.table_xinfo({table})") if row[6] == 0]
+
+def attach_archive(conn, archive_path):
+    """
+    Attach the archive database as 'archive' and create the union views.
+
+    Must run outside a transaction. The file is created by SQLite on the
+    first write if it does not exist yet.
+
+    Args:
+        conn: Database connection
+        archive_path: Path to the archive database file
+    """
+    if not is_archive_attached(conn):
+        conn.execute("ATTACH DATABASE ? AS archive", (str(archive_path),))
+    create_archive_views(conn)
+
+def create_archive_tables(conn):
+    """
+    Give the attached archive database the same tables as the main one.
+
+    Tables are created from the main table's own CREATE statement, so the
+    column list, types and generated columns match. Columns added to the
+    main table by later migrations are added to the archive table too, and
+    the main table's indexes are created on the archive table.
+    """
+    #Create cursor
+    cursor = conn.cursor()
+
+    for table, ts_column in ARCHIVED_TABLES:
+        row = cursor.execute("SELECT sql FROM main.sqlite_master WHERE type = 'table' AND name = ?",
+                             (table,)).fetchone()
+        if row is None:
+            continue
+
+        #Same CREATE statement, pointed at the archive schema
+        create_sql = re.sub(rf"^CREATE TABLE\s+(IF NOT EXISTS\s+)?[\"'`]?{table}[\"'`]?",
+                            f"CREATE TABLE IF NOT EXISTS archive.{table}", row[0], flags=re.IGNORECASE)
+        cursor.execute(create_sql)
+
+        #Columns the main table gained after the archive table was created
+        archived = set(stored_columns(conn, table, "archive"))
+        for column, column_type in [(info[1], info[2]) for info in cursor.execute(f"PRAGMA main.table_xinfo({table})")
+                                    if info[6] == 0 and info[1] not in archived]:
+            cursor.execute(f"ALTER TABLE archive.{table} ADD COLUMN {column} {column_type}")
+
+        #Historical range and bucket queries read the archive through its timestamp
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS archive.idx_{table}_{ts_column} ON {table}({ts_column})")
+
+        #Same indexes as the main table, so reads with include_archive use covering indexes on both sides
+        for index_name, index_sql in cursor.execute("""
+                SELECT name, sql FROM main.sqlite_master
+                WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL
+                """, (table,)).fetchall():
+            cursor.execute(re.sub(rf"^CREATE\s+(UNIQUE\s+)?INDEX\s+(IF NOT EXISTS\s+)?[\"'`]?{index_name}[\"'`]?",
+                                  rf"CREATE \1INDEX IF NOT EXISTS archive.{index_name}", index_sql, flags=re.IGNORECASE))
+
+    create_archive_views(conn)
+
+def create_archive_views(conn):
+    """
+    Create TEMP views all_<table> joining the hot and archived rows of each archived table.
+
+    TEMP views belong to the connection, so they can read from both the
+    main and the attached archive database.
+    """
+    for table, _ in ARCHIVED_TABLES:
+        exists = conn.execute("SELECT 1 FROM archive.sqlite_master WHERE type = 'table' AND name = ?",
+                              (table,)).fetchone()
+        if exists is None:
+            continue
+
+        #Name every column so both sides line up whatever order columns were added in
+        columns = [row[1] for row in conn.execute(f"PRAGMA main.table_xinfo({table})")]
+        column_list = ", ".join(columns)
+
+        conn.execute(f"DROP VIEW IF EXISTS temp.all_{table}")
+        conn.execute(f"""
+            CREATE TEMP VIEW all_{table} AS
+            SELECT {column_list} FROM main.{table}
+            UNION ALL
+            SELECT {column_list} FROM archive.{table}
+        """)
+
+#Tables whose writes are counted in table_versions (read by the query result cache)
+VERSIONED_TABLES = ["cyber_incidents", "it_tickets", "datasets_metadata"]
+
+def create_table_versions(conn):
+    """
+    Create table_versions (one write counter per table) and the triggers that bump it.
+
+    Every insert, update and delete adds one to the table's counter in the
+    same transaction, whichever code path made the change, so a cached
+    result is current exactly when the counters it was read at still match.
+    """
+    #Create cursor
+    cursor = conn.cursor()
+
+    #SQL statement to create table_versions table
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS table_versions(
+            table_name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    """)
+
+    for table in VERSIONED_TABLES:
+        cursor.execute("INSERT OR IGNORE INTO table_versions (table_name) VALUES (?)", (table,))
+
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_version_{event.lower()}
+                AFTER {event} ON {table}
+                BEGIN UPDATE table_versions SET version = version + 1 WHERE table_name = '{table}'; END
+            """)
+
+#Tickets counted by the resolution time percentiles. The percentile query uses
+#this exact text so SQLite can answer it from the partial indexes below.
+RESOLVED_TICKETS = "status_key IN ('resolved', 'closed') AND resolution_hours IS NOT NULL"
+
+#Month a ticket was created, as grouped by the percentiles
+CREATED_MONTH = "strftime('%Y-%m', created_ts, 'unixepoch')"
+
+#Partial indexes in (group, hours) order, so each group's tickets are read already sorted
+RESOLUTION_INDEXES = [
+    ("idx_tickets_resolution_priority", "priority_key, resolution_hours"),
+    ("idx_tickets_resolution_assignee", "assigned_to, resolution_hours"),
+    ("idx_tickets_resolution_month", f"{CREATED_MONTH}, resolution_hours"),
+]
+
+def add_resolution_hours_column(conn):
+    """
+    Add it_tickets.resolution_hours and move hour counts out of resolved_date.
+
+    Older loads stored the CSV's resolution_time_hours (and the Dashboard
+    its day count) as text in resolved_date. Those numbers move to the new
+    column and resolved_date becomes created_date plus that time. Rows
+    with a real resolved date get the hours between the two dates.
+    """
+    #Create cursor
+    cursor = conn.cursor()
+
+    #Add the column unless it already exists
+    cursor.execute("PRAGMA table_info(it_tickets)")
+    if "resolution_hours" not in [row[1] for row in cursor.fetchall()]:
+        cursor.execute("ALTER TABLE it_tickets ADD COLUMN resolution_hours REAL")
+
+    #resolved_date holding only digits and dots is an hour count
+    cursor.execute("""
+        UPDATE it_tickets
+        SET resolution_hours = CAST(resolved_date AS REAL),
+            resolved_date = strftime('%Y-%m-%d %H:%M:%S', created_date,
+                                     '+' || CAST(resolved_date AS REAL) || ' hours')
+        WHERE resolved_date GLOB '[0-9]*' AND resolved_date NOT GLOB '*[^0-9.]*'
+    """)
+
+    #Hours between creation and a real resolved date
+    cursor.execute("""
+        UPDATE it_tickets
+        SET resolution_hours = ROUND((julianday(resolved_date) - julianday(created_date)) * 24, 2)
+        WHERE resolution_hours IS NULL AND julianday(resolved_date) IS NOT NULL
+    """)
+
+    for name, columns in RESOLUTION_INDEXES:
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON it_tickets({columns}) WHERE {RESOLVED_TICKETS}")
+
+    #Refresh planner statistics for the new indexes
+    cursor.execute("ANALYZE it_tickets")
+
+def create_base_tables(conn):
+    """Create the user and domain tables."""
     create_users_table(conn)
     create_cyber_incidents_table(conn)
     create_datasets_metadata_table(conn)
     create_it_tickets_table(conn)
+
+#Ordered schema migrations (version, description, function).
+#PRAGMA user_version stores the last version applied to a database file.
+#Never edit or reorder a released migration; append a new one instead.
+MIGRATIONS = [
+    (1, "create users and domain tables", create_base_tables),
+    (2, "add users.domain to older databases", add_users_domain_column),
+    (3, "create ingest_manifest table", create_ingest_manifest_table),
+    (4, "create analytical indexes", create_indexes),
+    (5, "create dataset facets index", create_dataset_facets_index),
+    (6, "create trigger-maintained domain_counts table", create_domain_counts_table),
+    (7, "add indexed epoch timestamp columns", add_timestamp_columns),
+    (8, "add generated enum key columns", add_enum_key_columns),
+    (9, "create FTS5 search indexes", create_fts_tables),
+    (10, "create trigger-maintained table_versions table", create_table_versions),
+    (11, "add indexed it_tickets.resolution_hours", add_resolution_hours_column),
+]
+
+#Version of a fully migrated database
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+def get_schema_version(conn):
+    """Return the schema version stored in the database file."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def migrate(conn):
+    """
+    Bring the database schema up to SCHEMA_VERSION.
+
+    Returns straight away when the database is already current. Otherwise
+    every pending migration runs inside one transaction, so a failure
+    leaves the schema at its previous version.
+
+    Args:
+        conn: Database connection
+
+    Returns:
+        int: Schema version after migrating
+    """
+    #Fast path: nothing to do, no DDL is sent
+    if get_schema_version(conn) >= SCHEMA_VERSION:
+        return SCHEMA_VERSION
+
+    #Take the write lock so two processes never migrate at the same time
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        #Another process may have migrated while we waited for the lock
+        current = get_schema_version(conn)
+        applied = []
+
+        #Apply pending migrations in order
+        for version, description, migration in MIGRATIONS:
+            if version > current:
+                migration(conn)
+                applied.append((version, description))
+
+        #Record the new version in the same transaction
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+        #Save changes
+        conn.commit()
+    except Exception:
+        #Leave the schema as it was
+        conn.rollback()
+        raise
+
+    #Success message
+    for version, description in applied:
+        print(f"✅ Migration {version} applied: {description}")
+
+    return SCHEMA_VERSION
+
+def create_all_tables(conn):
+    """Create all tables (applies any pending migrations)."""
+    return migrate(conn)
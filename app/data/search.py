@@ -0,0 +1,92 @@
+import re
+
+from app.data.frames import read_frame, select_list
+from app.data.schema import FTS_TABLES
+
+#Rows returned by a search unless a limit is given
+SEARCH_LIMIT = 20
+
+#Marks put around matched words in snippets
+HIGHLIGHT_START = "«"
+HIGHLIGHT_END = "»"
+
+def to_match_query(text):
+    """
+    Turn free text typed by a user into a safe FTS5 MATCH expression.
+
+    Every word is quoted, so FTS5 operators and punctuation in the text are
+    searched for literally instead of raising a syntax error. All words
+    must match and the last one also matches as a prefix (search as you type)
+    once it has at least two characters.
+
+    Args:
+        text: Search box text
+
+    Returns:
+        str: MATCH expression, or "" when the text has no words
+    """
+    words = re.findall(r"\w+", text or "")
+    if not words:
+        return ""
+
+    terms = [f'"{word}"' for word in words]
+    if len(words[-1]) >= 2:
+        terms[-1] += "*"
+    return " ".join(terms)
+
+def search_table(conn, table, text, limit=SEARCH_LIMIT, columns=None, weights=None):
+    """
+    Rank rows of a table against search text using its FTS5 index.
+
+    Args:
+        conn: Database connection
+        table: Searched table (see FTS_TABLES)
+        text: Search box text
+        limit: Maximum number of rows returned
+        columns: Columns of the table to return (None for every column)
+        weights: bm25 weight of each indexed column (optional, default 1.0 each)
+
+    Returns:
+        pd.DataFrame: Matching rows best first, with snippet and rank columns
+    """
+    #Find the FTS table of the searched table
+    indexes = {source: (fts, indexed) for source, fts, indexed in FTS_TABLES}
+    if table not in indexes:
+        raise ValueError(f"No search index for '{table}'. Choose from: {', '.join(indexes)}")
+    fts, indexed = indexes[table]
+
+    match = to_match_query(text)
+    weights = weights or [1.0] * len(indexed)
+
+    #Table columns prefixed with the table alias
+    selected = ", ".join(f"t.{column}" for column in select_list(table, columns).split(", "))
+
+    #Rank and snippet come from the index; the row itself is a primary key lookup
+    query = f"""
+    SELECT {selected},
+           snippet({fts}, -1, '{HIGHLIGHT_START}', '{HIGHLIGHT_END}', '…', 12) AS snippet,
+           bm25({fts}, {", ".join(str(float(weight)) for weight in weights)}) AS rank
+    FROM {fts}
+    JOIN {table} AS t ON t.id = {fts}.rowid
+    WHERE {fts} MATCH ?
+    ORDER BY rank
+    LIMIT ?
+    """
+    #Empty text matches nothing (LIMIT 0 keeps the same columns)
+    return read_frame(conn, query, (match or '""', int(limit) if match else 0))
+
+def rebuild_search_index(conn, table=None):
+    """
+    Rebuild FTS5 indexes from their source tables and merge their segments.
+
+    Only needed after rows were changed with the triggers disabled or the
+    index is suspected to be out of step. The caller commits.
+
+    Args:
+        conn: Database connection
+        table: Table whose index is rebuilt (None for all of FTS_TABLES)
+    """
+    for source, fts, _ in FTS_TABLES:
+        if table is None or table == source:
+            conn.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+            conn.execute(f"INSERT INTO {fts}({fts}) VALUES ('optimize')")
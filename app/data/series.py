@@ -0,0 +1,62 @@
+import pandas as pd
+
+from app.data.archive import source_table
+
+#SQL expressions rounding an epoch timestamp down to the start of its bucket.
+#Weeks start on Monday (1970-01-05 is the first Monday after the epoch, 345600s in).
+BUCKETS = {
+    "hour": "{ts} - {ts} % 3600",
+    "day": "{ts} - {ts} % 86400",
+    "week": "{ts} - ({ts} - 345600) % 604800",
+    "month": "CAST(strftime('%s', {ts}, 'unixepoch', 'start of month') AS INTEGER)",
+}
+
+def to_epoch(value):
+    """Convert a date string, datetime or epoch number to epoch seconds."""
+    if isinstance(value, (int, float)):
+        return int(value)
+    return int(pd.Timestamp(value).timestamp())
+
+def read_series(conn, table, ts_column, label, bucket="day", start=None, end=None, include_archive=False):
+    """
+    Count rows per time bucket using an indexed epoch timestamp column.
+
+    Args:
+        conn: Database connection
+        table: Table to count
+        ts_column: Epoch seconds column (see TIMESTAMP_COLUMNS)
+        label: Name of the bucket column in the result
+        bucket: "hour", "day", "week" or "month"
+        start: Only count rows at or after this date (optional)
+        end: Only count rows before this date (optional)
+        include_archive: Also count archived rows
+
+    Returns:
+        pd.DataFrame: label (bucket start as datetime) and count, oldest first
+    """
+    #Only known bucket expressions are put into the SQL
+    if bucket not in BUCKETS:
+        raise ValueError(f"Unknown bucket '{bucket}'. Choose from: {', '.join(BUCKETS)}")
+
+    #Date range as a range scan of the timestamp index
+    conditions = [f"{ts_column} IS NOT NULL"]
+    params = []
+    if start is not None:
+        conditions.append(f"{ts_column} >= ?")
+        params.append(to_epoch(start))
+    if end is not None:
+        conditions.append(f"{ts_column} < ?")
+        params.append(to_epoch(end))
+
+    query = f"""
+    SELECT {BUCKETS[bucket].format(ts=ts_column)} AS bucket, COUNT(*) AS count
+    FROM {source_table(conn, table, include_archive, [ts_column])}
+    WHERE {" AND ".join(conditions)}
+    GROUP BY bucket
+    ORDER BY bucket ASC
+    """
+    df = pd.read_sql_query(query, conn, params=params)
+
+    #Bucket start as a datetime for the charts
+    df.insert(0, label, pd.to_datetime(df.pop("bucket"), unit="s"))
+    return df
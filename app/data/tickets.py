@@ -1,158 +1,249 @@
 import pandas as pd
-from app.data.db import connect_database
+from app.data.db import connect_database, get_connection
+from app.data.archive import source_table
+from app.data.cache import cached
+from app.data.bulk import bulk_delete, bulk_insert, bulk_update
+from app.data.counters import get_domain_counts
+from app.data.facets import read_facets
+from app.data.frames import read_frame, select_list
+from app.data.pagination import PAGE_SIZE, get_id_range, read_page
+from app.data.registry import hot_query
+from app.data.schema import CREATED_MONTH, RESOLVED_TICKETS
+from app.data.search import SEARCH_LIMIT, search_table
+from app.data.series import read_series
 
 def insert_ticket(priority, status, category, subject,
                   description, created_date, resolved_date=None,
-                  assigned_to=None):
-    """Insert new IT ticket."""
-    #Connect to database
-    conn = connect_database()
-
-    #Create cursor
-    cursor = conn.cursor()
-
-    #Execute insert statement
-    cursor.execute("""
-        INSERT INTO it_tickets
-        (priority, status, category, subject, description,
-         created_date, resolved_date, assigned_to)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (priority, status,
-              category if category else "General",
-              subject if subject else "No Subject",
-              description,
-              created_date, resolved_date, assigned_to))
-
-    #Save changes
-    conn.commit()
-
-    #Get id of inserted ticket
-    ticket_id = cursor.lastrowid
-
-    #Close connection
-    conn.close()
+                  assigned_to=None, conn=None, resolution_hours=None):
+    """Insert new IT ticket (resolution_hours is the time taken to resolve it, in hours)."""
+    #Join the caller's unit of work or borrow a pooled connection (saved when block exits)
+    with get_connection(conn=conn) as conn:
+        #Create cursor
+        cursor = conn.cursor()
+
+        #Execute insert statement
+        cursor.execute("""
+            INSERT INTO it_tickets
+            (priority, status, category, subject, description,
+             created_date, resolved_date, assigned_to, resolution_hours)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (priority, status,
+                  category if category else "General",
+                  subject if subject else "No Subject",
+                  description,
+                  created_date, resolved_date, assigned_to, resolution_hours))
+
+        #Get id of inserted ticket
+        ticket_id = cursor.lastrowid
 
     #Return ticket id
     return ticket_id
 
-def get_all_tickets():
-    """Get all tickets as DataFrame."""
-    #Connect to database
-    conn = connect_database()
+def get_all_tickets(columns=None, include_archive=False):
+    """
+    Get all tickets as a typed DataFrame.
 
-    #Read data into DataFrame
-    df = pd.read_sql_query(
-        "SELECT * FROM it_tickets ORDER BY id DESC",
-        conn
-    )
+    Args:
+        columns: Columns to read (None for every column)
+        include_archive: Also return archived tickets
 
-    #Close connection
-    conn.close()
+    Returns:
+        pd.DataFrame: Tickets newest first, with categorical and datetime columns
+    """
+    #Borrow pooled connection
+    with get_connection() as conn:
+        #Read only the requested columns into a typed DataFrame
+        df = read_frame(conn, f"SELECT {select_list('it_tickets', columns)} "
+                              f"FROM {source_table(conn, 'it_tickets', include_archive)} ORDER BY id DESC")
 
     #Return DataFrame
     return df
 
-def update_ticket(conn, ticket_id, new_status):
-    """Update status of a ticket."""
-    #Connect to database
-    conn = connect_database()
+#Columns get_tickets_page can filter on
+TICKET_FILTER_COLUMNS = ["status", "priority", "category", "assigned_to"]
 
-    #Create cursor
-    cursor = conn.cursor()
+@hot_query({}, {"cursor": 1000}, {"include_archive": True})
+def get_tickets_page(conn, page_size=PAGE_SIZE, cursor=None, filters=None, columns=None, include_archive=False):
+    """
+    Get one page of tickets, newest first.
+
+    Args:
+        conn: Database connection
+        page_size: Rows per page
+        cursor: Last id of the previous page (None for the first page)
+        filters: Optional dict of column -> value, columns from TICKET_FILTER_COLUMNS
+        columns: Columns to read (None for every column)
+        include_archive: Also page through archived tickets
+
+    Returns:
+        tuple: (DataFrame of the page, cursor of the next page or None)
+    """
+    return read_page(conn, "it_tickets", page_size, cursor, filters, TICKET_FILTER_COLUMNS, columns,
+                     source_table(conn, "it_tickets", include_archive))
 
-    #Execute update statement
-    cursor.execute("""
-        UPDATE it_tickets SET status = ? WHERE id = ?
-        """, (new_status, ticket_id))
+@hot_query()
+@cached("it_tickets")
+def get_ticket_id_range(conn):
+    """Return (smallest id, largest id) of tickets."""
+    return get_id_range(conn, "it_tickets")
 
-    #Save changes
-    conn.commit()
+def update_ticket(conn, ticket_id, new_status):
+    """Update status of a ticket."""
+    #Join the caller's unit of work or borrow a pooled connection (saved when block exits)
+    with get_connection(conn=conn) as conn:
+        #Create cursor
+        cursor = conn.cursor()
 
-    #Get number of updated rows
-    row_count = cursor.rowcount
+        #Execute update statement
+        cursor.execute("""
+            UPDATE it_tickets SET status = ? WHERE id = ?
+            """, (new_status, ticket_id))
 
-    #Close connection
-    conn.close()
+        #Get number of updated rows
+        row_count = cursor.rowcount
 
     #Return number of updated rows
     return row_count
 
-def delete_ticket(ticket_id):
+def delete_ticket(ticket_id, conn=None):
     """Delete ticket by ID."""
-    # Connect to database
-    conn = connect_database()
+    #Join the caller's unit of work or borrow a pooled connection (saved when block exits)
+    with get_connection(conn=conn) as conn:
+        #Create cursor
+        cursor = conn.cursor()
 
-    #Create cursor
-    cursor = conn.cursor()
+        #Execute delete statement
+        cursor.execute("""
+                DELETE FROM it_tickets WHERE id = ?
+                """, (ticket_id,))
 
-    #Execute delete statement
-    cursor.execute("""
-            DELETE FROM it_tickets WHERE id = ?
-            """, (ticket_id,))
+        #Get number of deleted rows
+        row_count = cursor.rowcount
 
-    #Save changes
-    conn.commit()
+    #Return number of deleted rows
+    return row_count
 
-    #Get number of deleted rows
-    row_count = cursor.rowcount
+#Columns written by insert_tickets, in the order of each row tuple
+TICKET_INSERT_COLUMNS = ["priority", "status", "category", "subject", "description",
+                         "created_date", "resolved_date", "assigned_to", "resolution_hours"]
 
-    #Close connection
-    conn.close()
+def insert_tickets(tickets, conn=None):
+    """
+    Insert many IT tickets in one transaction.
 
-    #Return number of deleted rows
-    return row_count
+    Args:
+        tickets: List of dicts with the arguments of insert_ticket
+        conn: Connection of an open unit of work (optional)
+
+    Returns:
+        list[int]: Id of each new ticket, in input order
+    """
+    #Same defaults as insert_ticket
+    rows = [(ticket["priority"], ticket["status"],
+             ticket.get("category") or "General",
+             ticket.get("subject") or "No Subject",
+             ticket["description"], ticket["created_date"],
+             ticket.get("resolved_date"), ticket.get("assigned_to"),
+             ticket.get("resolution_hours")) for ticket in tickets]
+
+    #Join the caller's unit of work or borrow a pooled connection (saved when block exits)
+    with get_connection(conn=conn) as conn:
+        return bulk_insert(conn, "it_tickets", TICKET_INSERT_COLUMNS, rows)
+
+def update_tickets_status(ticket_ids, new_status, conn=None):
+    """
+    Set the status of many tickets in one transaction.
+
+    Args:
+        ticket_ids: Ids of the tickets to update
+        new_status: Status given to every ticket
+        conn: Connection of an open unit of work (optional)
 
-def get_tickets_by_status_count(conn):
+    Returns:
+        dict: ticket id -> True if updated, False if not found
+    """
+    #Join the caller's unit of work or borrow a pooled connection (saved when block exits)
+    with get_connection(conn=conn) as conn:
+        return bulk_update(conn, "it_tickets", "status", new_status, ticket_ids)
+
+def delete_tickets(ticket_ids, conn=None):
+    """
+    Delete many tickets in one transaction.
+
+    Args:
+        ticket_ids: Ids of the tickets to delete
+        conn: Connection of an open unit of work (optional)
+
+    Returns:
+        dict: ticket id -> True if deleted, False if not found
+    """
+    #Join the caller's unit of work or borrow a pooled connection (saved when block exits)
+    with get_connection(conn=conn) as conn:
+        return bulk_delete(conn, "it_tickets", ticket_ids)
+
+@hot_query({}, {"include_archive": True})
+@cached("it_tickets")
+def get_tickets_by_status_count(conn, include_archive=False):
     """
     Count tickets by status.
+    Pass include_archive=True to also count archived tickets.
     Uses: SELECT, FROM, GROUP BY, ORDER BY
     """
-    query = """
+    query = f"""
     SELECT status, COUNT(*) as count
-    FROM it_tickets
+    FROM {source_table(conn, "it_tickets", include_archive, ["status"])}
     GROUP BY status
     ORDER BY count DESC
     """
     df = pd.read_sql_query(query, conn)
     return df
 
-def get_high_priority_by_assignee(conn):
+@hot_query({}, {"include_archive": True})
+@cached("it_tickets")
+def get_high_priority_by_assignee(conn, include_archive=False):
     """
     Count high priority tickets by assigned person.
+    Pass include_archive=True to also count archived tickets.
     Uses: SELECT, FROM, WHERE, GROUP BY, ORDER BY
     """
-    query = """
+    query = f"""
     SELECT assigned_to, COUNT(*) as count
-    FROM it_tickets
-    WHERE priority = 'High'
+    FROM {source_table(conn, "it_tickets", include_archive, ["assigned_to", "priority_key"])}
+    WHERE priority_key = 'high'
     GROUP BY assigned_to
     ORDER BY count DESC
     """
     df = pd.read_sql_query(query, conn)
     return df
 
-def get_tickets_by_assigned_to(conn):
+@hot_query({}, {"include_archive": True})
+@cached("it_tickets")
+def get_tickets_by_assigned_to(conn, include_archive=False):
     """
     Count tickets grouped by the assigned engineer.
+    Pass include_archive=True to also count archived tickets.
     Uses: SELECT, FROM, GROUP BY, ORDER BY
     """
-    query = """
+    query = f"""
     SELECT assigned_to, COUNT(*) as count
-    FROM it_tickets
+    FROM {source_table(conn, "it_tickets", include_archive, ["assigned_to"])}
     GROUP BY assigned_to
     ORDER BY count DESC
     """
     df = pd.read_sql_query(query, conn)
     return df
 
-def get_categories_with_many_tickets(conn, min_count=5):
+@hot_query({}, {"include_archive": True})
+@cached("it_tickets")
+def get_categories_with_many_tickets(conn, min_count=5, include_archive=False):
     """
     Find ticket categories with more than min_count cases.
+    Pass include_archive=True to also count archived tickets.
     Uses: SELECT, FROM, GROUP BY, HAVING, ORDER BY
     """
-    query = """
+    query = f"""
     SELECT category, COUNT(*) as count
-    FROM it_tickets
+    FROM {source_table(conn, "it_tickets", include_archive, ["category"])}
     GROUP BY category
     HAVING COUNT(*) > ?
     ORDER BY count DESC
@@ -160,62 +251,206 @@ def get_categories_with_many_tickets(conn, min_count=5):
     df = pd.read_sql_query(query, conn, params=(min_count,))
     return df
 
-def get_tickets_by_priority(conn):
+@hot_query({}, {"include_archive": True})
+@cached("it_tickets")
+def get_tickets_by_priority(conn, include_archive=False):
     """
     Count tickets grouped by priority.
+    Pass include_archive=True to also count archived tickets.
     Uses: SELECT, FROM, GROUP BY, ORDER BY
     """
-    query = """
+    query = f"""
     SELECT priority, COUNT(*) as count
-    FROM it_tickets
+    FROM {source_table(conn, "it_tickets", include_archive, ["priority"])}
     GROUP BY priority
     ORDER BY count DESC
     """
     df = pd.read_sql_query(query, conn)
     return df
 
-def get_tickets_over_time(conn):
-    """
-    Count tickets created per day.
-    Uses: SELECT, FROM, GROUP BY, ORDER BY
+@cached("it_tickets")
+def get_ticket_series(conn, bucket="day", start=None, end=None, include_archive=False):
     """
-    query = """
-    SELECT created_date, COUNT(*) as count
-    FROM it_tickets
-    GROUP BY created_date
-    ORDER BY created_date ASC
+    Count tickets per hour, day, week or month of their creation date.
+
+    Buckets are computed in SQL from the indexed created_ts column.
+
+    Args:
+        conn: Database connection
+        bucket: "hour", "day", "week" or "month"
+        start: Only count tickets at or after this date (optional)
+        end: Only count tickets before this date (optional)
+        include_archive: Also count archived tickets
+
+    Returns:
+        pd.DataFrame: created_date (bucket start) and count, oldest first
     """
-    df = pd.read_sql_query(query, conn)
-    return df
+    return read_series(conn, "it_tickets", "created_ts", "created_date", bucket, start, end, include_archive)
+
+@hot_query()
+def get_tickets_over_time(conn):
+    """Count tickets per day of their creation date ordered chronologically."""
+    return get_ticket_series(conn, bucket="day")
 
-def get_open_tickets(conn):
+@hot_query()
+def get_open_tickets(conn, columns=None):
     """
     Retrieve all tickets that are currently open.
     Uses: SELECT, FROM, WHERE, ORDER BY
+
+    Only closed and resolved tickets are archived, so the main table holds every open one.
+
+    Args:
+        conn: Database connection
+        columns: Columns to read (None for every column)
     """
-    query = """
-    SELECT *
+    query = f"""
+    SELECT {select_list("it_tickets", columns)}
     FROM it_tickets
-    WHERE LOWER(status) = 'open'
+    WHERE status_key = 'open'
     ORDER BY created_date DESC
     """
-    df = pd.read_sql_query(query, conn)
+    df = read_frame(conn, query)
     return df
 
-def get_high_or_critical_tickets(conn):
+@hot_query({}, {"include_archive": True})
+def get_high_or_critical_tickets(conn, columns=None, include_archive=False):
     """
     Retrieve tickets with High or Critical priority.
     Uses: SELECT, FROM, WHERE, ORDER BY
+
+    Args:
+        conn: Database connection
+        columns: Columns to read (None for every column)
+        include_archive: Also return archived tickets
     """
-    query = """
-    SELECT *
-    FROM it_tickets
-    WHERE LOWER(priority) IN ('high', 'critical')
-    ORDER BY created_date DESC
+    #'+' stops SQLite from walking the date index over every row instead of using the severity/priority index
+    query = f"""
+    SELECT {select_list("it_tickets", columns)}
+    FROM {source_table(conn, "it_tickets", include_archive)}
+    WHERE priority_key IN ('high', 'critical')
+    ORDER BY +created_date DESC
+    """
+    df = read_frame(conn, query)
+    return df
+
+
+@hot_query({}, {"include_archive": True})
+@cached("it_tickets")
+def get_ticket_facets(conn, bucket="day", start=None, end=None, include_archive=False):
+    """
+    Count tickets by status, priority and assignee in one query, plus the time series.
+
+    Args:
+        conn: Database connection
+        bucket: Time bucket of tickets_over_time ("hour", "day", "week" or "month")
+        start: Start of the tickets_over_time date range (optional)
+        end: End of the tickets_over_time date range (optional)
+        include_archive: Also count archived tickets
+
+    Returns:
+        dict: tickets_over_time, tickets_by_assigned_to, tickets_by_priority
+              and tickets_by_status DataFrames
+    """
+    #One UNION ALL statement, each part answered from its column's index
+    facets = read_facets(conn, "it_tickets", {
+        "tickets_by_assigned_to": "assigned_to",
+        "tickets_by_priority": "priority",
+        "tickets_by_status": "status",
+    }, include_archive)
+
+    #Time series bucketed in SQL on the epoch timestamp index
+    facets["tickets_over_time"] = get_ticket_series(conn, bucket, start, end, include_archive)
+    return facets
+
+@hot_query({}, {"include_archive": True})
+@cached("it_tickets")
+def get_ticket_counts(conn, include_archive=False):
+    """
+    Count all, open and High/Critical priority tickets from the trigger-maintained counters.
+
+    Args:
+        conn: Database connection
+        include_archive: Also count archived tickets
+
+    Returns:
+        dict: total, open and high_critical counts
+    """
+    return get_domain_counts(conn, "it_tickets", include_archive)
+
+#Groupings of the resolution time percentiles: name -> (SQL grouping key, SQL label)
+RESOLUTION_GROUPS = {
+    "priority": ("priority_key", "UPPER(SUBSTR(priority_key, 1, 1)) || SUBSTR(priority_key, 2)"),
+    "assigned_to": ("assigned_to", "assigned_to"),
+    "month": (CREATED_MONTH, CREATED_MONTH),
+}
+
+@hot_query({"group_by": "priority"}, {"group_by": "assigned_to"}, {"group_by": "month"},
+           {"group_by": "priority", "include_archive": True})
+@cached("it_tickets")
+def get_resolution_percentiles(conn, group_by="priority", include_archive=False):
+    """
+    Mean, median, p90 and p95 time to resolve of resolved and closed tickets.
+
+    Computed in SQL with one window per group read in order from the
+    partial resolution_hours indexes (no sort), using the nearest-rank
+    method: the smallest time at or above the percentile's share of the
+    group's tickets.
+
+    Args:
+        conn: Database connection
+        group_by: "priority", "assigned_to" or "month" (month the ticket was created)
+        include_archive: Also include archived tickets
+
+    Returns:
+        pd.DataFrame: group_by, tickets, mean_hours, p50_hours, p90_hours, p95_hours
+    """
+    #Only known groupings are put into the SQL
+    if group_by not in RESOLUTION_GROUPS:
+        raise ValueError(f"Unknown grouping '{group_by}'. Choose from: {', '.join(RESOLUTION_GROUPS)}")
+    key, label = RESOLUTION_GROUPS[group_by]
+
+    #Both window functions share one window, so rows are ranked in a single ordered pass
+    query = f"""
+    WITH ranked AS (
+        SELECT {key} AS group_key, {label} AS label, resolution_hours,
+               ROW_NUMBER() OVER resolution AS position,
+               COUNT(*) OVER (resolution ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING) AS tickets
+        FROM {source_table(conn, "it_tickets", include_archive)}
+        WHERE {RESOLVED_TICKETS}
+        WINDOW resolution AS (PARTITION BY {key} ORDER BY resolution_hours)
+    )
+    SELECT MIN(label) AS {group_by},
+           COUNT(*) AS tickets,
+           ROUND(AVG(resolution_hours), 1) AS mean_hours,
+           MIN(CASE WHEN position >= 0.50 * tickets THEN resolution_hours END) AS p50_hours,
+           MIN(CASE WHEN position >= 0.90 * tickets THEN resolution_hours END) AS p90_hours,
+           MIN(CASE WHEN position >= 0.95 * tickets THEN resolution_hours END) AS p95_hours
+    FROM ranked
+    GROUP BY group_key
+    ORDER BY {"MIN(label)" if group_by == "month" else "mean_hours DESC"}
     """
     df = pd.read_sql_query(query, conn)
     return df
 
+@hot_query({"text": "password reset"})
+def search_tickets(conn, text, limit=SEARCH_LIMIT, columns=None):
+    """
+    Full-text search of tickets by subject and description, best match first.
+
+    Only the main table is indexed, so archived tickets are not searched.
+
+    Args:
+        conn: Database connection
+        text: Words to search for (the last word also matches as a prefix)
+        limit: Maximum number of tickets returned
+        columns: Columns to read (None for every column)
+
+    Returns:
+        pd.DataFrame: Matching tickets with a highlighted snippet and bm25 rank
+    """
+    #A subject hit counts twice as much as a description hit
+    return search_table(conn, "it_tickets", text, limit, columns, weights=[2.0, 1.0])
 
 def testing_functions():
     """Helper to print ticket analytics when executed directly."""
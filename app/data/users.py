@@ -1,39 +1,35 @@
-from app.data.db import connect_database
+from app.data.db import get_connection
 from app.services.auth import USER_DATA_FILE, hash_password
 
 
 def get_user_by_username(username):
     """Retrieve user by username."""
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute(
-        "SELECT id, username, password_hash, role, domain FROM users WHERE username = ?",
-        (username,)
-    )
-    user = cursor.fetchone()
-    conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT id, username, password_hash, role, domain FROM users WHERE username = ?",
+            (username,)
+        )
+        user = cursor.fetchone()
     return user
 
 
 def insert_user(username, password_hash, role="user", domain=None):
     """Insert new user."""
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute(
-        "INSERT INTO users (username, password_hash, role, domain) VALUES (?, ?, ?, ?)",
-        (username, password_hash, role, domain)
-    )
-    conn.commit()
-    conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT INTO users (username, password_hash, role, domain) VALUES (?, ?, ?, ?)",
+            (username, password_hash, role, domain)
+        )
 
 
 def get_all_users():
     """Return all users as a list of dictionaries."""
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute("SELECT username, role, domain FROM users ORDER BY username ASC")
-    rows = cursor.fetchall()
-    conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT username, role, domain FROM users ORDER BY username ASC")
+        rows = cursor.fetchall()
     return [
         {"username": row[0], "role": row[1], "domain": row[2]}
         for row in rows
@@ -45,27 +41,25 @@ def update_user_role(username, new_role, new_domain=None):
     if new_role != "analyst":
         new_domain = None
 
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute(
-        "UPDATE users SET role = ?, domain = ? WHERE username = ?",
-        (new_role, new_domain, username)
-    )
-    conn.commit()
-    updated = cursor.rowcount
-
     password_hash = ""
     domain_value = ""
-    if updated:
+    with get_connection() as conn:
+        cursor = conn.cursor()
         cursor.execute(
-            "SELECT password_hash, domain FROM users WHERE username = ?",
-            (username,)
+            "UPDATE users SET role = ?, domain = ? WHERE username = ?",
+            (new_role, new_domain, username)
         )
-        row = cursor.fetchone()
-        if row:
-            password_hash = row[0]
-            domain_value = row[1] or ""
-    conn.close()
+        updated = cursor.rowcount
+
+        if updated:
+            cursor.execute(
+                "SELECT password_hash, domain FROM users WHERE username = ?",
+                (username,)
+            )
+            row = cursor.fetchone()
+            if row:
+                password_hash = row[0]
+                domain_value = row[1] or ""
 
     if not updated:
         return False, f"Username '{username}' not found."
@@ -110,12 +104,10 @@ def update_user_role(username, new_role, new_domain=None):
 
 def delete_user(username):
     """Delete user by username."""
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM users WHERE username = ?", (username,))
-    conn.commit()
-    deleted = cursor.rowcount
-    conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM users WHERE username = ?", (username,))
+        deleted = cursor.rowcount
     if not deleted:
         return False, f"Username '{username}' not found."
 
@@ -150,22 +142,17 @@ def reset_user_password(username, new_password):
     """Reset a user's password and keep the database and users.txt in sync."""
     hashed_password = hash_password(new_password).decode("utf-8")
 
-    #Create database connection and cursor object
-    conn = connect_database()
-    cursor = conn.cursor()
-
+    #Borrow pooled connection and create cursor object (changes are saved when block exits)
+    with get_connection() as conn:
+        cursor = conn.cursor()
 
-    cursor.execute(
-        "UPDATE users SET password_hash = ? WHERE username = ?",
-        (hashed_password, username)
-    )
+        cursor.execute(
+            "UPDATE users SET password_hash = ? WHERE username = ?",
+            (hashed_password, username)
+        )
 
-    #Save changes
-    conn.commit()
-    #Get number of updated rows
-    db_rows_updated = cursor.rowcount
-    #Close database connection
-    conn.close()
+        #Get number of updated rows
+        db_rows_updated = cursor.rowcount
 
     #Read users.txt file
     try:
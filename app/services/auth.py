@@ -4,7 +4,7 @@ import time
 import secrets
 from pathlib import Path
 
-from app.data.db import connect_database
+from app.data.db import get_connection
 from models.auth import User    #Import class User
 
 #Variables to store file paths
@@ -78,14 +78,11 @@ def register_user(username, password, role, analyst_domain=None):
 
     #Mirror user into database so admin panel stays in sync
     try:
-        conn = connect_database()
-        cursor = conn.cursor()
-        cursor.execute(
-            "INSERT INTO users (username, password_hash, role, domain) VALUES (?, ?, ?, ?)",
-            (username, hashed_password, role, analyst_domain)
-        )
-        conn.commit()
-        conn.close()
+        with get_connection() as conn:
+            conn.execute(
+                "INSERT INTO users (username, password_hash, role, domain) VALUES (?, ?, ?, ?)",
+                (username, hashed_password, role, analyst_domain)
+            )
     except Exception:
         pass
 
@@ -2,7 +2,7 @@ import sqlite3
 import bcrypt
 from pathlib import Path
 
-from app.data.db import connect_database
+from app.data.db import get_connection
 from app.data.users import get_user_by_username, insert_user
 from app.data.schema import create_users_table
 from app.services.auth import USER_DATA_FILE
@@ -59,29 +59,26 @@ def register_user(username, password, role="user", domain=None):
         tuple: (success: bool, message: str)
     """
 
-    #Create database connection and cursor object
-    conn = connect_database()
-    cursor = conn.cursor()
+    #Borrow pooled connection and create cursor object
+    with get_connection() as conn:
+        cursor = conn.cursor()
 
-    # Check if user already exists
-    cursor.execute("SELECT * FROM users WHERE username = ?", (username,))
-    if cursor.fetchone():
-        conn.close()
-        return False, f"Username '{username}' already exists."
+        # Check if user already exists
+        cursor.execute("SELECT * FROM users WHERE username = ?", (username,))
+        if cursor.fetchone():
+            return False, f"Username '{username}' already exists."
 
-    # Hash the password
-    password_bytes = password.encode('utf-8')
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password_bytes, salt)
-    password_hash = hashed.decode('utf-8')
-
-    # Insert new user
-    cursor.execute(
-        "INSERT INTO users (username, password_hash, role, domain) VALUES (?, ?, ?, ?)",
-        (username, password_hash, role, domain)
-    )
-    conn.commit()
-    conn.close()
+        # Hash the password
+        password_bytes = password.encode('utf-8')
+        salt = bcrypt.gensalt()
+        hashed = bcrypt.hashpw(password_bytes, salt)
+        password_hash = hashed.decode('utf-8')
+
+        # Insert new user (saved when block exits)
+        cursor.execute(
+            "INSERT INTO users (username, password_hash, role, domain) VALUES (?, ?, ?, ?)",
+            (username, password_hash, role, domain)
+        )
 
     sync_user_to_file(username, password_hash, role, domain)
 
@@ -100,13 +97,12 @@ def login_user(username, password):
     Returns:
         tuple: (success: bool, message: str)
     """
-    conn = connect_database()
-    cursor = conn.cursor()
+    with get_connection() as conn:
+        cursor = conn.cursor()
 
-    # Find user
-    cursor.execute("SELECT password_hash, role, domain FROM users WHERE username = ?", (username,))
-    user = cursor.fetchone()
-    conn.close()
+        # Find user
+        cursor.execute("SELECT password_hash, role, domain FROM users WHERE username = ?", (username,))
+        user = cursor.fetchone()
 
     if not user:
         return False, "Username not found."
@@ -178,12 +174,9 @@ def migrate_users_from_file(conn, filepath):
     print(f"✅ Migrated {migrated_count} users from {filepath.name}")
 
     # Verify users were migrated
-    conn = connect_database()
-    cursor = conn.cursor()
-
-    # Query all users
-    cursor.execute("SELECT id, username, role, domain FROM users")
-    users = cursor.fetchall()
+    with get_connection() as pooled_conn:
+        # Query all users
+        users = pooled_conn.execute("SELECT id, username, role, domain FROM users").fetchall()
 
     print(" Users in database:")
     print(f"{'ID':<5} {'Username':<15} {'Role':<10} {'Domain':<15}")
@@ -192,4 +185,3 @@ def migrate_users_from_file(conn, filepath):
         print(f"{user[0]:<5} {user[1]:<15} {user[2]:<10} {user[3] or '-':<15}")
 
     print(f"\nTotal users: {len(users)}")
-    conn.close()
@@ -1,6 +1,7 @@
 import pandas as pd
 
-from app.data.db import connect_database
+from app.data.db import get_connection
+from app.data.categories import assign_category
 
 #Define class
 class Dataset:
@@ -11,7 +12,8 @@ class Dataset:
                  last_updated, record_count:int, column_count:int, file_size_mb):
         #Private attributes
         self.__dataset_name = dataset_name
-        self.__category = category
+        #Derive category from the name with the rule table when none is given
+        self.__category = category or assign_category(dataset_name)
         self.__source = source
         self.__last_updated = last_updated
         self.__record_count = record_count
@@ -19,32 +21,25 @@ class Dataset:
         self.__file_size_mb = round(float(file_size_mb), 1) #Round file size to 1 floating point
 
     #Method to insert new dataset into database
-    def insert_dataset(self) -> int:
+    def insert_dataset(self, conn=None) -> int:
         """Insert new dataset metadata into database"""
-        #Connect to database
-        conn = connect_database()
-
-        #Create cursor
-        cursor = conn.cursor()
-        
-        #Execute insert statement
-        cursor.execute("""
-                            INSERT INTO datasets_metadata
-                            (dataset_name, category, source, last_updated,
-                            record_count, column_count, file_size_mb)
-                            VALUES (?, ?, ?, ?, ?, ?, ?)
-                        """,(self.__dataset_name, self.__category, self.__source, self.__last_updated,
-                            self.__record_count, self.__column_count, self.__file_size_mb),
-                        )
-        
-        #Save changes
-        conn.commit()
-
-        #Get id of inserted dataset
-        self.__dataset_id = cursor.lastrowid
-
-        #Close connection
-        conn.close()
+        #Join the caller's unit of work or borrow a pooled connection (saved when block exits)
+        with get_connection(conn=conn) as conn:
+            #Create cursor
+            cursor = conn.cursor()
+
+            #Execute insert statement
+            cursor.execute("""
+                                INSERT INTO datasets_metadata
+                                (dataset_name, category, source, last_updated,
+                                record_count, column_count, file_size_mb)
+                                VALUES (?, ?, ?, ?, ?, ?, ?)
+                            """,(self.__dataset_name, self.__category, self.__source, self.__last_updated,
+                                self.__record_count, self.__column_count, self.__file_size_mb),
+                            )
+
+            #Get id of inserted dataset
+            self.__dataset_id = cursor.lastrowid
 
         #Return dataset id
         return self.__dataset_id
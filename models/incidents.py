@@ -3,7 +3,10 @@ import sys
 
 import pandas as pd
 
-from app.data.db import connect_database
+from app.data.db import get_connection
+from app.data.frames import read_frame, select_list
+from app.data.incidents import get_incidents_page
+from app.data.pagination import PAGE_SIZE
 
 #Adjust path to main project directory
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -13,15 +16,20 @@ sys.path.append(ROOT_DIR)
 class Cybersecurity:
     """Base class for cybersecurity incidents."""
 
-    def get_all_incidents(self) -> pd.DataFrame:
-        conn = connect_database()
-        df = pd.read_sql_query(
-            "SELECT * FROM cyber_incidents ORDER BY id DESC",
-            conn,
-        )
-        conn.close()
+    def get_all_incidents(self, columns=None, conn=None) -> pd.DataFrame:
+        with get_connection(conn=conn) as conn:
+            df = read_frame(
+                conn,
+                f"SELECT {select_list('cyber_incidents', columns)} FROM cyber_incidents ORDER BY id DESC",
+            )
         return df
 
+    def get_incidents_page(self, page_size: int = PAGE_SIZE, cursor=None, filters=None, columns=None, conn=None,
+                           include_archive=False):
+        """Return (one page of incidents newest first, cursor of the next page)."""
+        with get_connection(conn=conn) as conn:
+            return get_incidents_page(conn, page_size, cursor, filters, columns, include_archive)
+
 
 class Cyberincident(Cybersecurity):
     """Represents a single cybersecurity incident."""
@@ -36,55 +44,42 @@ class Cyberincident(Cybersecurity):
         self.__description = description
         self.__reported_by = reported_by
 
-    def insert_incident(self) -> int:
+    def insert_incident(self, conn=None) -> int:
         """Insert new incident into database."""
-        #Connect to database
-        conn = connect_database()
-        #Create cursor object
-        cursor = conn.cursor()
-
-        #Execute insert statement
-        cursor.execute("""
-                        INSERT INTO cyber_incidents
-                        (date, incident_type, severity, status, description, reported_by)
-                        VALUES (?, ?, ?, ?, ?, ?)
-                       """,(self.__date,self.__incident_type,self.__severity,self.__status,
-                            self.__description,self.__reported_by))
-        
-        #Save changes
-        conn.commit()
-
-        #Get id of inserted incident
-        incident_id = cursor.lastrowid
-
-        #Close connection
-        conn.close()
+        #Join the caller's unit of work or borrow a pooled connection (saved when block exits)
+        with get_connection(conn=conn) as conn:
+            #Create cursor object
+            cursor = conn.cursor()
+
+            #Execute insert statement
+            cursor.execute("""
+                            INSERT INTO cyber_incidents
+                            (date, incident_type, severity, status, description, reported_by)
+                            VALUES (?, ?, ?, ?, ?, ?)
+                           """,(self.__date,self.__incident_type,self.__severity,self.__status,
+                                self.__description,self.__reported_by))
+
+            #Get id of inserted incident
+            incident_id = cursor.lastrowid
 
         #Return id of incident
         return incident_id
 
     #Method to change status of incident
-    def update_incident(self, incident_id: int, new_status: str) -> int:
+    def update_incident(self, incident_id: int, new_status: str, conn=None) -> int:
         """Update incident status of an incident"""
-        #Connect to database
-        conn = connect_database()
-
-        #Create cursor
-        cursor = conn.cursor()
-
-        #Execute update statement
-        cursor.execute("""
-            UPDATE cyber_incidents SET status = ? WHERE id = ?
-            """, (new_status, incident_id))
-        
-        #Save changes
-        conn.commit()
-
-        #Get number of updated rows
-        row_count = cursor.rowcount
-
-        #Close connection
-        conn.close()
+        #Join the caller's unit of work or borrow a pooled connection (saved when block exits)
+        with get_connection(conn=conn) as conn:
+            #Create cursor
+            cursor = conn.cursor()
+
+            #Execute update statement
+            cursor.execute("""
+                UPDATE cyber_incidents SET status = ? WHERE id = ?
+                """, (new_status, incident_id))
+
+            #Get number of updated rows
+            row_count = cursor.rowcount
 
         #Return number of updated rows
         return row_count 
\ No newline at end of file
@@ -1,4 +1,4 @@
-from app.data.db import connect_database
+from app.data.db import get_connection
 
 
 class ITTicket:
@@ -9,26 +9,21 @@ class ITTicket:
         #Private attributes
         self._ticket_id = ticket_id
 
-    def update_ticket(self, new_status: str) -> int:
+    def update_ticket(self, new_status: str, conn=None) -> int:
         """Update status of a ticket."""
-        #Connect to database
-        conn = connect_database()
+        #Join the caller's unit of work or borrow a pooled connection (saved when block exits)
+        with get_connection(conn=conn) as conn:
+            #Create cursor object
+            cursor = conn.cursor()
 
-        #Create cursor object
-        cursor = conn.cursor()
+            #Execute update statement
+            cursor.execute("""
+                            UPDATE it_tickets SET status = ? WHERE id = ?
+                            """, (new_status, self._ticket_id))
 
-        #Execute update statement
-        cursor.execute("""
-                        UPDATE it_tickets SET status = ? WHERE id = ?
-                        """, (new_status, self._ticket_id))
-        
-        #Save changes
-        conn.commit()
-        #Get number of updated rows
-        row_count = cursor.rowcount
+            #Get number of updated rows
+            row_count = cursor.rowcount
 
-        #Close database connection
-        conn.close()
         #Return number of updated rows
         return row_count
 
@@ -37,7 +32,8 @@ class NewITTicket(ITTicket):
     """Child class to insert new tickets in database"""
 
     #Initialise attributes
-    def __init__(self, priority, status, category, subject, description, created_date, resolved_date, assigned_to):
+    def __init__(self, priority, status, category, subject, description, created_date, resolved_date, assigned_to,
+                 resolution_hours=None):
         #Relate to parent class attribute
         super().__init__(ticket_id=0)
 
@@ -50,29 +46,26 @@ class NewITTicket(ITTicket):
         self.__created_date = created_date
         self.__resolved_date = resolved_date
         self.__assigned_to = assigned_to
+        self.__resolution_hours = resolution_hours
 
-    def insert_ticket(self) -> int:
-        #Connect to database
-        conn = connect_database()
-        #Create cursor object
-        cursor = conn.cursor()
+    def insert_ticket(self, conn=None) -> int:
+        #Join the caller's unit of work or borrow a pooled connection (saved when block exits)
+        with get_connection(conn=conn) as conn:
+            #Create cursor object
+            cursor = conn.cursor()
 
-        #Execute insert statement
-        cursor.execute("""
-                        INSERT INTO it_tickets
-                        (priority, status, category, subject, description,
-                        created_date, resolved_date, assigned_to)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                        """,(self.__priority, self.__status, self.__category, self.__subject,
-                            self.__description, self.__created_date, self.__resolved_date, self.__assigned_to))
-        
-        #Save changes
-        conn.commit()
+            #Execute insert statement
+            cursor.execute("""
+                            INSERT INTO it_tickets
+                            (priority, status, category, subject, description,
+                            created_date, resolved_date, assigned_to, resolution_hours)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                            """,(self.__priority, self.__status, self.__category, self.__subject,
+                                self.__description, self.__created_date, self.__resolved_date, self.__assigned_to,
+                                self.__resolution_hours))
 
-        #Get id of inserted ticket
-        self._ticket_id = cursor.lastrowid
+            #Get id of inserted ticket
+            self._ticket_id = cursor.lastrowid
 
-        #Close database connection
-        conn.close()
         #Return ticket id
         return self._ticket_id
@@ -0,0 +1,60 @@
+import io
+import tempfile
+import streamlit as st
+
+from app.data.export import TEXT_FORMATS, count_export_rows, export_text
+
+#Largest export handed to the download button (Streamlit sends the file in one piece)
+DOWNLOAD_ROW_LIMIT = 200000
+
+def export_records(key, table, filter_column=None, filter_options=()):
+    """
+    Show an export form for a domain table and a download button once the file is ready.
+
+    Rows are streamed from the database in batches into a temporary file,
+    and the download button reads that file, so the export is never held
+    as a Python string. The file is only produced when the user asks for
+    it, not on every rerun, and is capped at DOWNLOAD_ROW_LIMIT rows.
+
+    Args:
+        key: Unique name for the widgets of this table
+        table: Domain table to export
+        filter_column: Column the user may filter the export on (optional)
+        filter_options: Values offered for filter_column
+    """
+    with st.expander("Export records"):
+        col_format, col_filter = st.columns(2)
+
+        with col_format:
+            #Prompt user to select file format
+            file_format = st.selectbox("Format", list(TEXT_FORMATS), key=f"{key}_export_format")
+
+        filters = None
+        if filter_column:
+            with col_filter:
+                #Prompt user to optionally filter the export
+                choice = st.selectbox(filter_column.replace("_", " ").title(), ["All", *filter_options],
+                                      key=f"{key}_export_filter")
+            if choice != "All":
+                filters = {filter_column: choice}
+
+        #Only build the file when requested
+        if st.button("Prepare Export", key=f"{key}_export_prepare"):
+            _, extension, mime = TEXT_FORMATS[file_format]
+
+            #Warn before cutting an export that is too large to send in one piece
+            rows = count_export_rows(table, filters=filters)
+            if rows > DOWNLOAD_ROW_LIMIT:
+                st.warning(f"{rows:,} rows match. Only the first {DOWNLOAD_ROW_LIMIT:,} are exported; "
+                           f"narrow the filter to export the rest.")
+
+            #Stream the rows to disk as UTF-8, then hand the open file to the download button
+            with tempfile.TemporaryFile("w+b") as export_file:
+                with io.TextIOWrapper(export_file, encoding="utf-8", newline="") as text_file:
+                    export_text(text_file, table, file_format, filters=filters, limit=DOWNLOAD_ROW_LIMIT)
+                    text_file.flush()
+                    export_file.seek(0)
+
+                    st.download_button(f"Download {file_format}", data=export_file,
+                                       file_name=f"{table}.{extension}", mime=mime,
+                                       key=f"{key}_export_download", on_click="ignore")
@@ -0,0 +1,50 @@
+import streamlit as st
+
+def paged_records(key, fetch_page):
+    """
+    Show Previous/Next buttons for a keyset-paginated table and return the current page.
+
+    The cursors of the pages already visited are kept in session state,
+    so moving back does not need OFFSET either.
+
+    Args:
+        key: Unique name for the session state of this table
+        fetch_page: Function taking a cursor and returning (DataFrame, next cursor)
+
+    Returns:
+        pd.DataFrame: Rows of the current page
+    """
+    cursors_key = f"{key}_page_cursors"
+
+    #First visit starts at the newest record
+    if cursors_key not in st.session_state:
+        st.session_state[cursors_key] = [None]
+    cursors = st.session_state[cursors_key]
+
+    #Fetch current page
+    page, next_cursor = fetch_page(cursors[-1])
+
+    #Records of this page were deleted: go back to the first page
+    if page.empty and len(cursors) > 1:
+        cursors[:] = [None]
+        page, next_cursor = fetch_page(None)
+
+    #Split navigation into columns
+    col_prev, col_page, col_next = st.columns([1, 2, 1])
+
+    with col_prev:
+        #Go back to the previous page
+        if st.button("◀ Previous", key=f"{key}_prev", disabled=len(cursors) == 1):
+            cursors.pop()
+            st.rerun()
+
+    with col_page:
+        st.caption(f"Page {len(cursors)}")
+
+    with col_next:
+        #Continue after the last record shown
+        if st.button("Next ▶", key=f"{key}_next", disabled=next_cursor is None):
+            cursors.append(next_cursor)
+            st.rerun()
+
+    return page
@@ -8,23 +8,29 @@ from datetime import timedelta
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.append(ROOT_DIR)
 
-#Import database connection function
-from app.data.db import connect_database
+#Import database connection functions
+from app.data.db import read_snapshot, transaction
 
 #Import incident management functions
 from app.data.incidents import (
     delete_incident,
-    get_open_incidents,
-    get_high_or_critical_incidents)
+    delete_incidents,
+    update_incidents_status,
+    get_incident_counts,
+    get_incident_id_range,
+    search_incidents)
 
 #Import classes
 from models.incidents import Cybersecurity, Cyberincident
 
 #Import datasets management functions
 from app.data.datasets import (
-    get_all_datasets,
+    get_datasets_page,
+    get_dataset_count,
+    get_dataset_id_range,
     update_dataset_record,
     delete_dataset,
+    get_datasets_by_category,
     get_large_datasets_by_source,
     get_large_columns_datasets)
 
@@ -33,15 +39,25 @@ from models.datasets import Dataset
 
 #Import tickets management functions
 from app.data.tickets import (
-    get_all_tickets,
+    get_tickets_page,
+    get_ticket_id_range,
     delete_ticket,
-    get_open_tickets,
-    get_high_or_critical_tickets)
+    delete_tickets,
+    update_tickets_status,
+    get_ticket_counts,
+    search_tickets)
 
 #Import class ITTicket
 from models.tickets import ITTicket, NewITTicket
 
 from my_app.components.sidebar import logout_section
+from my_app.components.pagination import paged_records
+from my_app.components.downloads import export_records
+
+def read_latest(query, *args, **kwargs):
+    """Run one read function on a read-only pooled connection, returned as soon as it finishes."""
+    with read_snapshot() as conn:
+        return query(conn, *args, **kwargs)
 
 #Webpage title and icon
 st.set_page_config(page_title="Dashboard", page_icon="📊", layout="wide")
@@ -116,8 +132,6 @@ if domain == "-- Select a Domain --":
 
 else:
     st.session_state.selected_domain = domain
-    #Connect to the shared intelligence platform database
-    conn = connect_database()
 
     #Inform user about domain selected
     st.info(f"Selected domain: **{domain}**")
@@ -139,21 +153,20 @@ else:
         #Create object/instance for class Cyberincident
         incident_oop = Cybersecurity()
 
-        #Fetches all incidents from database using method from class
-        incidents = incident_oop.get_all_incidents()
-        total_incidents = len(incidents)
+        #Let user count and list incidents moved to the archive database too
+        incidents_archive = st.checkbox("Include archived incidents", value = False, key = "incidents_archive")
 
-        #Get maximum and minimum incident id from database
-        max_incident_id = int(incidents["id"].max()) if total_incidents else None
-        min_incident_id = int(incidents["id"].min()) if total_incidents else None
+        #Read the overview from one snapshot of the read-only pool
+        with read_snapshot() as conn:
+            #Read total, open and high/critical counters maintained by the database
+            incident_counts = get_incident_counts(conn, include_archive = incidents_archive)
 
-        #Fetches all Open incidents from database
-        open_incidents = get_open_incidents(conn)
-        total_open_incidents = len(open_incidents)
+            #Get minimum and maximum incident id from database
+            min_incident_id, max_incident_id = get_incident_id_range(conn)
 
-        #Fetches all high or critical incidents from database
-        high_critical_incidents = get_high_or_critical_incidents(conn)
-        total_high_critical_incidents = len(high_critical_incidents)
+        total_incidents = incident_counts["total"]
+        total_open_incidents = incident_counts["open"]
+        total_high_critical_incidents = incident_counts["high_critical"]
 
         #Split webpage into columns
         col1, col2, col3 = st.columns(3)
@@ -171,11 +184,27 @@ else:
             st.metric("High/Critical incidents", total_high_critical_incidents, border = True)
 
         #Verify if incidents database was found
-        if incidents.empty:
+        if total_incidents == 0:
             st.info("No incidents recorded yet. Add a new one below.")
         else:
-            #Display incidents in a table
+            #Display one page of incidents in a table using method from class
+            incidents = paged_records("incidents", lambda cursor: incident_oop.get_incidents_page(
+                cursor=cursor, include_archive=incidents_archive))
             st.dataframe(incidents, use_container_width = True)
+
+            #Full-text search of incident descriptions
+            incident_search = st.text_input("Search incidents", placeholder = "e.g. phishing email",
+                                            help = "Searches live incidents only: archived incidents are not indexed.")
+            if incident_search:
+                incident_hits = read_latest(search_incidents, incident_search,
+                                            columns = ["date", "incident_type", "severity", "status"])
+                if incident_hits.empty:
+                    st.info("No incidents match your search.")
+                else:
+                    st.dataframe(incident_hits.drop(columns = "rank"), use_container_width = True)
+
+            #Download incidents as CSV or NDJSON
+            export_records("incidents", "cyber_incidents", "status", ["Open", "In Progress", "Resolved", "Closed"])
     
         st.divider()
         st.markdown("#### Incidents Management")
@@ -230,7 +259,7 @@ else:
             st.markdown("##### Delete Incident")
 
             #This prevents any error from table of incidents not being displayed
-            if incidents.empty:
+            if total_incidents == 0:
                 st.info("No incidents available for deletion or updates yet.")
             else:
                 #Form to delete incident
@@ -300,6 +329,44 @@ else:
                     else:
                         #Error message
                         st.error("No incident found with that ID.")
+
+                st.markdown("##### Bulk Actions")
+
+                #Form to close or delete several incidents of the page shown above at once
+                with st.form("bulk_incidents"):
+                    #Prompt user to select incidents from the current page
+                    selected_incident_ids = st.multiselect("Incident IDs (current page)", incidents["id"].tolist())
+                    bulk_incident_action = st.radio("Action", ["Close selected", "Delete selected"], horizontal = True)
+                    confirm_bulk_incident = st.checkbox("Yes, apply to all selected incidents.")
+                    #Button to submit form
+                    submit_bulk_incident = st.form_submit_button("Apply")
+
+                #Verify if form is submitted
+                if submit_bulk_incident:
+                    #Verify confirmation checkbox
+                    if not confirm_bulk_incident:
+                        st.warning("Please confirm bulk action before proceeding.")
+                    #Verify if any incident is selected
+                    elif not selected_incident_ids:
+                        st.warning("Please select at least one incident.")
+                    else:
+                        #Apply action to every selected incident in one transaction
+                        if bulk_incident_action == "Close selected":
+                            results = update_incidents_status(selected_incident_ids, "Closed")
+                        else:
+                            results = delete_incidents(selected_incident_ids)
+
+                        #Report rows that no longer exist
+                        missing = [row_id for row_id, done in results.items() if not done]
+                        done_word = "closed" if bulk_incident_action == "Close selected" else "deleted"
+                        st.success(f"{len(results) - len(missing)} incidents {done_word}.")
+                        if missing:
+                            st.warning(f"Not found: {', '.join(map(str, missing))}")
+
+                        #Pause program for 1s
+                        time.sleep(1)
+                        #Rerun whole script
+                        st.rerun()
         else:
             st.warning("Only admins or Cyber Security analysts can manage incidents.")
 
@@ -308,20 +375,21 @@ else:
 
         st.markdown("##### Overview of Datasets")
 
-        #Fetch all datasets from database
-        datasets = get_all_datasets()
-        total_datasets = len(datasets)
+        #Read the overview from one snapshot of the read-only pool
+        with read_snapshot() as conn:
+            #Count datasets in database
+            total_datasets = get_dataset_count(conn)
 
-        #Get maximum and minimum dataset id from database
-        min_dataset_id = int(datasets["id"].min()) if total_datasets else None
-        max_dataset_id = int(datasets["id"].max()) if total_datasets else None
+            #Get minimum and maximum dataset id from database
+            min_dataset_id, max_dataset_id = get_dataset_id_range(conn)
 
-        #Fetches all datasets with >10000 record counts
-        large_datasets = get_large_datasets_by_source(conn)
-        total_large_datasets = len(large_datasets)
+            #Fetches all datasets with >10000 record counts
+            large_datasets = get_large_datasets_by_source(conn)
+
+            #Fetches all datasets with >10 column counts
+            large_col_datasets = get_large_columns_datasets(conn)
 
-        #Fetches all datasets with >10 column counts
-        large_col_datasets = get_large_columns_datasets(conn)
+        total_large_datasets = len(large_datasets)
         total_large_col_datasets = len(large_col_datasets)
 
         #Split webpage into columns
@@ -339,12 +407,17 @@ else:
             #Generate metric for total datasets with >10 columns
             st.metric("More than 10 columns", total_large_col_datasets, border = True)
 
-        #Display datasets in a table
-        if datasets.empty:
+        #Display one page of datasets in a table
+        if total_datasets == 0:
             st.info("No datasets recorded yet. Add a new one below.")
         else:
+            datasets = paged_records("datasets", lambda cursor: read_latest(get_datasets_page, cursor=cursor))
             st.dataframe(datasets, use_container_width = True)
 
+            #Download datasets as CSV or NDJSON
+            export_records("datasets", "datasets_metadata", "category",
+                           read_latest(get_datasets_by_category)["category"].dropna().tolist())
+
         st.divider()
         st.markdown("#### Datasets Management")
 
@@ -360,7 +433,7 @@ else:
             with st.form("new_dataset"):
                 #Prompt user to enter dataset details
                 dataset_name = st.text_input("Dataset Name")
-                category = st.text_input("Category")
+                category = st.text_input("Category (leave blank to detect from name)")
                 source = st.text_input("Source")
                 last_updated = st.date_input("Last Updated")
                 record_count = st.number_input("Record Count", min_value = 1000, step = 1000)
@@ -377,7 +450,7 @@ else:
                 if not confirm_add_dataset:
                     st.warning("Please confirm addition before proceeding.")
                 #Verify if all fields are filled
-                elif not dataset_name or not category or not source or not last_updated:
+                elif not dataset_name or not source or not last_updated:
                     #Inform user to fill all fields
                     st.warning("Please fill in all fields.")
                 else:
@@ -404,7 +477,7 @@ else:
             st.markdown("##### Delete Dataset")
 
             #This prevents any error from table of datasets not being displayed
-            if datasets.empty:
+            if total_datasets == 0:
                 st.info("No datasets available for deletion or updates yet.")
             else:
                 #Form to delete dataset
@@ -457,17 +530,21 @@ else:
                     #Verify confirmation checkbox
                     if not confirm_update_dataset:
                         st.warning("Please confirm update before proceeding.")
-                    #Proceeds with updating record of dataset
-                    elif update_dataset_record(conn, int(dataset_id_update), int(new_record_count)):
-                        #Success message
-                        st.success(f"Dataset of ID {dataset_id_update} updated to {new_record_count} records.")
-                        #Pause program for 1s
-                        time.sleep(1)
-                        #Rerun whole script
-                        st.rerun()
                     else:
-                        #Error message
-                        st.error("No dataset found with that ID.")
+                        #Proceeds with updating record of dataset (committed before the rerun)
+                        with transaction() as tx:
+                            dataset_updated = update_dataset_record(tx, int(dataset_id_update), int(new_record_count))
+
+                        if dataset_updated:
+                            #Success message
+                            st.success(f"Dataset of ID {dataset_id_update} updated to {new_record_count} records.")
+                            #Pause program for 1s
+                            time.sleep(1)
+                            #Rerun whole script
+                            st.rerun()
+                        else:
+                            #Error message
+                            st.error("No dataset found with that ID.")
         else:
             st.warning("Only admins or Data Science analysts can manage datasets.")
 
@@ -476,21 +553,20 @@ else:
         
         st.markdown("##### Overview of Tickets")
 
-        #Fetch all tickets from database
-        tickets = get_all_tickets()
-        total_tickets = len(tickets)
+        #Let user count and list tickets moved to the archive database too
+        tickets_archive = st.checkbox("Include archived tickets", value = False, key = "tickets_archive")
 
-        #Get maximum and minimum ticket id from database
-        max_ticket_id = int(tickets["id"].max()) if total_tickets else None
-        min_ticket_id = int(tickets["id"].min()) if total_tickets else None
+        #Read the overview from one snapshot of the read-only pool
+        with read_snapshot() as conn:
+            #Get minimum and maximum ticket id from database
+            min_ticket_id, max_ticket_id = get_ticket_id_range(conn)
 
-        #Fetch open tickets count
-        open_tickets = get_open_tickets(conn)
-        total_open_tickets = len(open_tickets)
+            #Read total, open and high/critical priority counters maintained by the database
+            ticket_counts = get_ticket_counts(conn, include_archive = tickets_archive)
 
-        #Fetch high or critical priority tickets count
-        high_critical_tickets = get_high_or_critical_tickets(conn)
-        total_high_critical_tickets = len(high_critical_tickets)
+        total_tickets = ticket_counts["total"]
+        total_open_tickets = ticket_counts["open"]
+        total_high_critical_tickets = ticket_counts["high_critical"]
 
         #Split page into columns
         col1, col2, col3 = st.columns(3)
@@ -507,12 +583,29 @@ else:
             #Generate high or critical tickets
             st.metric("High/Critical Tickets", total_high_critical_tickets, border = True)
 
-        #Display tickets in a table
-        if tickets.empty:
+        #Display one page of tickets in a table
+        if total_tickets == 0:
             st.info("No tickets recorded yet. Add a new one below.")
         else:
+            tickets = paged_records("tickets", lambda cursor: read_latest(get_tickets_page, cursor=cursor,
+                                                                          include_archive=tickets_archive))
             st.dataframe(tickets, use_container_width = True)    
 
+            #Full-text search of ticket subjects and descriptions
+            ticket_search = st.text_input("Search tickets", placeholder = "e.g. password reset",
+                                          help = "Searches live tickets only: archived tickets are not indexed.")
+            if ticket_search:
+                ticket_hits = read_latest(search_tickets, ticket_search,
+                                          columns = ["priority", "status", "subject", "assigned_to"])
+                if ticket_hits.empty:
+                    st.info("No tickets match your search.")
+                else:
+                    st.dataframe(ticket_hits.drop(columns = "rank"), use_container_width = True)
+
+            #Download tickets as CSV or NDJSON
+            export_records("tickets", "it_tickets", "status",
+                           ["Open", "In Progress", "Waiting for User", "Resolved", "Closed"])
+
         st.divider()
         st.markdown("#### Tickets Management")
 
@@ -550,13 +643,14 @@ else:
                     #Inform user to fill all fields
                     st.warning("Please fill in all fields.")
                 else:
-                    #Convert resolved days into string
-                    resolved_days = str(resolved_days)
+                    #Resolved date is the created date plus the days required to resolve
+                    resolved_date = ticket_created_date + timedelta(days = int(resolved_days))
 
                     #Create object/instance using class NewITTicket
                     new_ticket = NewITTicket(ticket_priority, ticket_status, ticket_category, ticket_subject,
-                                            ticket_description,ticket_created_date.strftime("%Y-%m-%d"), resolved_days,
-                                            assigned_to)
+                                            ticket_description,ticket_created_date.strftime("%Y-%m-%d"),
+                                            resolved_date.strftime("%Y-%m-%d"), assigned_to,
+                                            resolution_hours = resolved_days * 24)
 
                     #Insert new ticket into database using method from class
                     new_ticket.insert_ticket()
@@ -573,7 +667,7 @@ else:
             st.markdown("##### Delete Ticket")
 
             #This prevents any error from table of tickets not being displayed
-            if tickets.empty:
+            if total_tickets == 0:
                 st.info("No tickets available for deletion or updates yet.")
             else:
                 #Form to delete ticket
@@ -647,8 +741,44 @@ else:
                     else:
                         #Error message
                         st.error("No ticket found with that ID.")
+
+                st.markdown("##### Bulk Actions")
+
+                #Form to close or delete several tickets of the page shown above at once
+                with st.form("bulk_tickets"):
+                    #Prompt user to select tickets from the current page
+                    selected_ticket_ids = st.multiselect("Ticket IDs (current page)", tickets["id"].tolist())
+                    bulk_ticket_action = st.radio("Action", ["Close selected", "Delete selected"], horizontal = True)
+                    confirm_bulk_ticket = st.checkbox("Yes, apply to all selected tickets.")
+                    #Button to submit form
+                    submit_bulk_ticket = st.form_submit_button("Apply")
+
+                #Verify if form is submitted
+                if submit_bulk_ticket:
+                    #Verify confirmation checkbox
+                    if not confirm_bulk_ticket:
+                        st.warning("Please confirm bulk action before proceeding.")
+                    #Verify if any ticket is selected
+                    elif not selected_ticket_ids:
+                        st.warning("Please select at least one ticket.")
+                    else:
+                        #Apply action to every selected ticket in one transaction
+                        if bulk_ticket_action == "Close selected":
+                            results = update_tickets_status(selected_ticket_ids, "Closed")
+                        else:
+                            results = delete_tickets(selected_ticket_ids)
+
+                        #Report rows that no longer exist
+                        missing = [row_id for row_id, done in results.items() if not done]
+                        done_word = "closed" if bulk_ticket_action == "Close selected" else "deleted"
+                        st.success(f"{len(results) - len(missing)} tickets {done_word}.")
+                        if missing:
+                            st.warning(f"Not found: {', '.join(map(str, missing))}")
+
+                        #Pause program for 1s
+                        time.sleep(1)
+                        #Rerun whole script
+                        st.rerun()
         else:
             st.warning("Only admins or IT Operations analysts can manage tickets.")
 
-    #Save changes
-    conn.commit()
@@ -10,32 +10,13 @@ sys.path.append(ROOT_DIR)
 
 from my_app.components.sidebar import logout_section
 
-#Import database connection function
-from app.data.db import connect_database
-
-#Import incident management functions
-from app.data.incidents import (
-    get_incidents_by_status,
-    get_incidents_by_severity,
-    get_incidents_by_type_count,
-    get_incidents_over_time)
-
-#Import dataset management functions
-from app.data.datasets import (
-    get_datasets_by_category,
-    get_datasets_by_source,
-    get_datasets_over_time,
-    get_dataset_record_counts,
-    get_dataset_column_counts)
-
-from app.data.tickets import (
-    get_tickets_over_time,
-    get_tickets_by_status_count,
-    get_tickets_by_priority,
-    get_tickets_by_assigned_to)
-
-#Connect to the shared intelligence platform database
-conn = connect_database()
+#Import read snapshot function
+from app.data.db import read_snapshot
+
+#Import chart aggregation functions (one scan per domain)
+from app.data.incidents import get_incident_facets
+from app.data.datasets import get_dataset_facets
+from app.data.tickets import get_ticket_facets, get_resolution_percentiles
 
 #Webpage title and icon
 st.set_page_config(page_title="Analytics", page_icon="📈", layout="wide")
@@ -93,10 +74,22 @@ if st.session_state.logged_in:
         #Implement logout
         logout_section()
 
+#Let user choose the time bucket of the time-series charts
+bucket = st.selectbox("Group time-series by", ["day", "week", "month", "hour"], format_func=str.capitalize)
+
+#Let user include incidents and tickets moved to the archive database (datasets are never archived)
+include_archive = False
+if domain in ("Cyber Security", "IT Operations"):
+    include_archive = st.checkbox("Include archived records", value = False)
+
 #Verify if domain is cyber security
 if domain == "Cyber Security":
-    #Take number of incidents per day
-    incidents_over_time = get_incidents_over_time(conn)
+    #Compute every chart from one scan in a consistent read snapshot
+    with read_snapshot() as conn:
+        charts = get_incident_facets(conn, bucket, include_archive = include_archive)
+
+    #Take number of incidents per time bucket
+    incidents_over_time = charts["incidents_over_time"]
 
     #Display time-series for cyberincidents
     if incidents_over_time.empty == False:
@@ -115,7 +108,7 @@ if domain == "Cyber Security":
 
     with col1:
         #Take incidents by type
-        incidents_by_type = get_incidents_by_type_count(conn)
+        incidents_by_type = charts["incidents_by_type"]
             
         #Verify if function successfully returned data
         if incidents_by_type.empty == False:
@@ -131,7 +124,7 @@ if domain == "Cyber Security":
         st.divider()
 
         #Take incidents by status
-        incidents_by_status = get_incidents_by_status(conn)
+        incidents_by_status = charts["incidents_by_status"]
 
         #Verify if function successfully returned data
         if incidents_by_status.empty == False:
@@ -146,7 +139,7 @@ if domain == "Cyber Security":
 
     with col2:
         #Take incidents by severity
-        incidents_by_severity = get_incidents_by_severity(conn)
+        incidents_by_severity = charts["incidents_by_severity"]
 
         #Verify if function successfully returned data
         if incidents_by_severity.empty == False:
@@ -168,8 +161,12 @@ if domain == "Cyber Security":
 
 #Verify if domain is data science
 if domain == "Data Science":
-    #Take number of datasets per day
-    datasets_over_time = get_datasets_over_time(conn)
+    #Compute every chart from one scan in a consistent read snapshot
+    with read_snapshot() as conn:
+        charts = get_dataset_facets(conn, bucket)
+
+    #Take number of datasets per time bucket
+    datasets_over_time = charts["datasets_over_time"]
 
     #Display time-series for datasets
     if datasets_over_time.empty == False:
@@ -188,7 +185,7 @@ if domain == "Data Science":
 
     with col1:
         #Display record counts per dataset
-        dataset_record_counts = get_dataset_record_counts(conn)
+        dataset_record_counts = charts["dataset_record_counts"]
 
         if dataset_record_counts.empty == False:
             st.markdown("##### Record Count per Dataset")
@@ -202,7 +199,7 @@ if domain == "Data Science":
         st.divider()
 
         #Take datasets by category 
-        datasets_by_category = get_datasets_by_category(conn)
+        datasets_by_category = charts["datasets_by_category"]
 
         #Verify if function successfully returned data
         if datasets_by_category.empty == False:
@@ -220,7 +217,7 @@ if domain == "Data Science":
 
     with col2:
         #Display column counts per dataset
-        dataset_column_counts = get_dataset_column_counts(conn)
+        dataset_column_counts = charts["dataset_column_counts"]
 
         if dataset_column_counts.empty == False:
             st.markdown("##### Column Count per Dataset")
@@ -234,7 +231,7 @@ if domain == "Data Science":
         st.divider()
 
         #Take datasets by source
-        datasets_by_source = get_datasets_by_source(conn)
+        datasets_by_source = charts["datasets_by_source"]
 
         #Verify if function successfully returned data
         if datasets_by_source.empty == False:
@@ -252,8 +249,15 @@ if domain == "Data Science":
 
 #Verify if domain is IT operations
 if domain == "IT Operations":   
-    #Take number of tickets created per day
-    tickets_over_time = get_tickets_over_time(conn)
+    #Compute every chart from one scan in a consistent read snapshot
+    with read_snapshot() as conn:
+        charts = get_ticket_facets(conn, bucket, include_archive = include_archive)
+        #Time-to-resolve percentiles computed by the database
+        resolution = {group: get_resolution_percentiles(conn, group, include_archive = include_archive)
+                      for group in ["priority", "assigned_to", "month"]}
+
+    #Take number of tickets created per time bucket
+    tickets_over_time = charts["tickets_over_time"]
 
     #Display time-series for IT tickets
     if tickets_over_time.empty == False:
@@ -269,7 +273,7 @@ if domain == "IT Operations":
     st.divider()
 
     #Take tickets by assignees
-    tickets_by_assigned_to = get_tickets_by_assigned_to(conn)
+    tickets_by_assigned_to = charts["tickets_by_assigned_to"]
 
     #Verify if function successfully returned data
     if tickets_by_assigned_to.empty == False:
@@ -292,7 +296,7 @@ if domain == "IT Operations":
 
     with col1: 
         #Take number of tickets by priority
-        tickets_by_priority = get_tickets_by_priority(conn)
+        tickets_by_priority = charts["tickets_by_priority"]
 
         #Verify if function returned data
         if tickets_by_priority.empty == False:
@@ -307,7 +311,7 @@ if domain == "IT Operations":
 
     with col2:
         #Take number of tickets by status
-        tickets_by_status = get_tickets_by_status_count(conn)
+        tickets_by_status = charts["tickets_by_status"]
 
         #Verify if function returned data
         if tickets_by_status.empty == False:
@@ -318,4 +322,25 @@ if domain == "IT Operations":
 
         else:
             #Inform user that no ticket status is found
-            st.info("No ticket status information available.")
\ No newline at end of file
+            st.info("No ticket status information available.")
+
+    st.divider()
+    st.markdown("##### Time to Resolve (hours)")
+
+    #Prompt user to select how resolution times are grouped
+    resolution_labels = {"Priority": "priority", "Assignee": "assigned_to", "Month Created": "month"}
+    resolution_group = resolution_labels[st.selectbox("Group resolved tickets by", list(resolution_labels))]
+    resolution_times = resolution[resolution_group]
+
+    #Verify if any resolved ticket has a resolution time
+    if resolution_times.empty == False:
+        #Generate bar chart for median and tail resolution times
+        st.bar_chart(resolution_times, x = resolution_group, y = ["p50_hours", "p90_hours", "p95_hours"],
+                     stack = False, use_container_width = True)
+
+        #Display mean and percentiles of every group
+        st.dataframe(resolution_times, use_container_width = True, hide_index = True)
+
+    else:
+        #Inform user that no resolution times are found
+        st.info("No resolved tickets with a resolution time available.")
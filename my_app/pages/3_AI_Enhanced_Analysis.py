@@ -3,41 +3,27 @@ from openai import OpenAI
 import os
 import sys
 
-#Import all incidents from database
-from app.data.incidents import (
-    get_incidents_by_severity,
-    get_incidents_by_status,
-    get_incidents_by_type_count,
-    get_incidents_over_time)
+#Import incident chart aggregation from database
+from app.data.incidents import get_incident_facets
 
 #Import class Cyberincident
 from models.incidents import Cybersecurity
 
 #Import all datasets from database
-from app.data.datasets import (
-    get_all_datasets,
-    get_dataset_column_counts,
-    get_dataset_record_counts,
-    get_datasets_by_category,
-    get_datasets_by_source,
-    get_datasets_over_time,
-)
+from app.data.datasets import get_datasets_page, get_dataset_facets
 
 #Import all tickets from database
-from app.data.tickets import (
-    get_all_tickets,
-    get_tickets_by_assigned_to,
-    get_tickets_by_priority,
-    get_tickets_by_status_count,
-    get_tickets_over_time,
-)
+from app.data.tickets import get_tickets_page, get_ticket_facets
 
-#Import database connection function
-from app.data.db import connect_database
+#Import read snapshot function
+from app.data.db import read_snapshot
 
 #Import logout function
 from my_app.components.sidebar import logout_section
 
+#Import page navigation for record selectboxes
+from my_app.components.pagination import paged_records
+
 #Import system prompt generation for a specific domain
 from my_app.components.ai_functions import get_ai_prompt, get_chart_prompt, get_system_prompt
 
@@ -123,9 +109,6 @@ st.divider()
 #Generate system prompt for selected domain
 system_prompt = get_system_prompt(domain)
 
-#Connect to database
-conn = connect_database()
-
 st.markdown("#### AI Analysis of Charts")
 
 #Store chart data for selected domain from dashboard
@@ -138,13 +121,10 @@ if domain == "Cyber Security":
 
     #Create object/instance for class Cyberincident
     incident_oop = Cybersecurity()
-    charts = {
-        "incidents_over_time": get_incidents_over_time(conn),
-        "incidents_by_type": get_incidents_by_type_count(conn),
-        "incidents_by_status": get_incidents_by_status(conn),
-        "incidents_by_severity": get_incidents_by_severity(conn),
-        "all_incidents": incident_oop.get_all_incidents(),  #Fetches all incidents from database using method from class
-    }
+    #All charts come from one scan in a consistent read snapshot
+    with read_snapshot() as conn:
+        charts = get_incident_facets(conn)
+    charts["recent_incidents"] = incident_oop.get_incidents_page(columns=["incident_type", "severity", "status"])[0]  #Fetches latest page of incidents using method from class
 
     #Iterate through dictionary charts
     #name represents key and df the value(dataframe)
@@ -160,12 +140,8 @@ if domain == "Cyber Security":
 elif domain == "Data Science":
     #Create dictionaries to store all records in data science
     #Each key contains a dashboard chart with its data as its value as dataframe    
-    charts = {
-        "datasets_over_time": get_datasets_over_time(conn),
-        "dataset_record_counts": get_dataset_record_counts(conn),
-        "dataset_column_counts": get_dataset_column_counts(conn),
-        "datasets_by_category": get_datasets_by_category(conn),
-        "datasets_by_source": get_datasets_by_source(conn)}
+    with read_snapshot() as conn:
+        charts = get_dataset_facets(conn)
 
     #Iterate through dictionary charts
     #name represents key and df the value(dataframe)
@@ -181,11 +157,8 @@ elif domain == "Data Science":
 elif domain == "IT Operations":
     #Create dictionary to store all records in it operations
     #Each key contains a dashboard chart with its data as its value
-    charts = {
-        "tickets_over_time": get_tickets_over_time(conn),
-        "tickets_by_assigned_to": get_tickets_by_assigned_to(conn),
-        "tickets_by_priority": get_tickets_by_priority(conn),
-        "tickets_by_status": get_tickets_by_status_count(conn)}
+    with read_snapshot() as conn:
+        charts = get_ticket_facets(conn)
 
     #Iterate through dictionary charts
     #name represents key and df the value(dataframe)
@@ -197,9 +170,6 @@ elif domain == "IT Operations":
         #Convert dataframe to list of dictionaries
         domain_insights[name] = df.to_dict(orient="records")
 
-#Close databse connection after all data has been retrieved
-conn.close()
-
 #Verify if chart data exists for AI analysis
 if not domain_insights:
     #Inform user about unavailable chart data
@@ -248,8 +218,9 @@ if can_access_ai:
 
     #Verify if domain is cyber security
     if domain == "Cyber Security":
-        #Fetches all incidents from database using method from class
-        incidents = incident_oop.get_all_incidents()
+        #Fetches one page of incidents from database using method from class
+        incidents = paged_records("ai_incidents", lambda cursor: incident_oop.get_incidents_page(
+            cursor=cursor, columns=["incident_type", "severity", "status", "description"]))
 
 
         #In case selectbox is skipped, there is no creation of records
@@ -289,8 +260,9 @@ if can_access_ai:
 
     #Verify if domain is data science
     if domain == "Data Science":
-        #Fetch datasets from database
-        datasets = get_all_datasets()
+        #Fetch one page of datasets from database
+        with read_snapshot() as conn:
+            datasets = paged_records("ai_datasets", lambda cursor: get_datasets_page(conn, cursor=cursor))
 
         #Verify if function returned data
         if datasets.empty == False:
@@ -329,8 +301,11 @@ if can_access_ai:
 
     #Verify if domain is IT operations
     if domain == "IT Operations":
-        #Fetch tickets from database
-        tickets = get_all_tickets()
+        #Fetch one page of tickets from database
+        with read_snapshot() as conn:
+            tickets = paged_records("ai_tickets", lambda cursor: get_tickets_page(
+                conn, cursor=cursor, columns=["subject", "priority", "status", "category", "assigned_to",
+                                           "created_date", "resolved_date", "description"]))
 
         #Verify if any tickets exist
         if tickets.empty == False:
@@ -10,7 +10,7 @@ ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__fil
 sys.path.append(ROOT_DIR)
 
 #Import functions from other folders
-from app.data.db import connect_database
+from app.data.db import get_connection
 from my_app.components.sidebar import logout_section
 from app.services.user_service import migrate_users_from_file
 from app.services.auth import change_password, valid_roles, valid_analyst_domains, USER_DATA_FILE
@@ -59,14 +59,9 @@ if not st.session_state.logged_in:
 st.title("Settings")
 st.divider()
 
-#Create database connection
-conn = connect_database()
-
-#Reload users table
-migrate_users_from_file(conn, Path("DATA/users.txt"))
-
-#Close database connection
-conn.close()
+#Reload users table on a pooled connection (returned to the pool even if the script stops)
+with get_connection() as conn:
+    migrate_users_from_file(conn, Path("DATA/users.txt"))
 
 
 #Verify if user is logged in